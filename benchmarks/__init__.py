@@ -0,0 +1,5 @@
+"""
+Benchmarks for pychargify's hot paths. Run from the repository root, e.g.
+``python -m benchmarks.bench_dates``, or all of them with
+``python -m benchmarks.run`` for JSON results comparable across commits.
+"""
@@ -0,0 +1,55 @@
+"""
+Micro-benchmark for ``ChargifyDateField`` decoding.
+
+Compares the fast path of :func:`pychargify.models.parse_datetime`
+with the general purpose ``dateutil.parser.parse`` it falls back to::
+
+    python -m benchmarks.bench_dates
+"""
+from __future__ import print_function
+
+import timeit
+
+import dateutil.parser
+
+from pychargify.models import ChargifyDateField, parse_datetime
+
+
+VALUES = [
+    u'2013-08-28T20:40:23-04:00',
+    u'2013-09-28T20:52:33-04:00',
+    u'2014-01-01T00:00:00+00:00',
+    u'2013-08-28T20:40:13Z',
+]
+
+
+def run(number=20000):
+    """
+    Time each decoder over ``VALUES`` and return seconds per date string.
+    """
+    field = ChargifyDateField()
+
+    def decode(parser):
+        for value in VALUES:
+            parser(value)
+
+    results = {}
+    for name, parser in (('dateutil', dateutil.parser.parse),
+                         ('parse_datetime', parse_datetime),
+                         ('ChargifyDateField.decode', field.decode)):
+        seconds = min(timeit.repeat(
+            lambda: decode(parser), number=number, repeat=3))
+        results[name] = seconds / (number * len(VALUES))
+    return results
+
+
+def main():
+    results = run()
+    baseline = results['dateutil']
+    for name, seconds in sorted(results.items(), key=lambda item: item[1]):
+        print('{0:<26} {1:8.2f} us/date  {2:6.1f}x'.format(
+            name, seconds * 1e6, baseline / seconds))
+
+
+if __name__ == '__main__':
+    main()
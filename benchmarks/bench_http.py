@@ -0,0 +1,108 @@
+"""
+End-to-end request benchmark against :mod:`pychargify.stub`.
+
+Runs GETs and POSTs through a pooled :class:`pychargify.api.Chargify`
+client on a local stand-in server and reports throughput and latency
+percentiles::
+
+    python -m benchmarks.bench_http
+"""
+from __future__ import print_function
+
+import time
+import threading
+
+from pychargify.api import Chargify
+from pychargify.stub import StubData, StubServer
+
+
+def percentile(values, fraction):
+    """
+    Nearest-rank percentile of sorted ``values``.
+    """
+    index = max(int(round(fraction * len(values) + 0.5)) - 1, 0)
+    return values[min(index, len(values) - 1)]
+
+
+def measure(call, requests, concurrency):
+    """
+    Run ``call(number)`` ``requests`` times on ``concurrency`` threads and
+    return requests per second and latency percentiles in milliseconds.
+    """
+    latencies = []
+    lock = threading.Lock()
+    numbers = iter(range(requests))
+
+    def worker():
+        own = []
+        while True:
+            with lock:
+                number = next(numbers, None)
+            if number is None:
+                break
+            started = time.time()
+            call(number)
+            own.append(time.time() - started)
+        with lock:
+            latencies.extend(own)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.time() - started
+
+    latencies.sort()
+    return {
+        'requests_per_second': requests / elapsed,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p90_ms': percentile(latencies, 0.90) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+    }
+
+
+def run(requests=1000, concurrency=8, latency=0.0):
+    """
+    Benchmark GET by id, list pages and customer creation.
+    """
+    server = StubServer(StubData(customers=1000), latency=latency).start()
+    chargify = Chargify('1234', 'bench', base_url=server.url,
+                        pool_size=concurrency)
+
+    def get(number):
+        chargify.customer().get(object_id=number % 1000 + 1)
+
+    def page(number):
+        chargify.subscription()._get_page(
+            'subscriptions.json', number % 5 + 1, 200)
+
+    def post(number):
+        customer = chargify.customer()
+        customer.first_name = 'Bench'
+        customer.last_name = str(number)
+        customer.email = 'bench{0}@example.com'.format(number)
+        customer.save()
+
+    try:
+        return {
+            'get': measure(get, requests, concurrency),
+            'list_page': measure(page, requests // 10, concurrency),
+            'post': measure(post, requests, concurrency),
+        }
+    finally:
+        chargify.close()
+        server.stop()
+
+
+def main():
+    for name, stats in sorted(run().items()):
+        print('{0:<10} {1:8.0f} req/s  p50 {2:6.2f} ms  p90 {3:6.2f} ms  '
+              'p99 {4:6.2f} ms'.format(
+                  name, stats['requests_per_second'], stats['p50_ms'],
+                  stats['p90_ms'], stats['p99_ms']))
+
+
+if __name__ == '__main__':
+    main()
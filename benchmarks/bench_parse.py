@@ -0,0 +1,69 @@
+"""
+Benchmark for parsing pages of subscriptions and products into models.
+
+Scales the ``tests/fixtures`` rows (subscriptions with their nested
+customer and product) to ``ROWS`` rows and times
+:meth:`pychargify.models.Model.process_result` over them::
+
+    python -m benchmarks.bench_parse
+"""
+from __future__ import print_function
+
+import copy
+import json
+import os
+import timeit
+
+from pychargify.api import Product, Subscription
+
+
+ROWS = 10000
+
+FIXTURES = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'tests', 'fixtures')
+
+
+def load_rows(name='subscriptions', rows=ROWS):
+    """
+    ``rows`` rows shaped like the ``name`` fixture, with distinct ids.
+    """
+    with open(os.path.join(FIXTURES, '{0}.json'.format(name))) as file_:
+        fixture = json.load(file_)
+
+    out = []
+    for number in range(rows):
+        row = copy.deepcopy(fixture[number % len(fixture)])
+        obj = list(row.values())[0]
+        obj['id'] = number
+        if 'customer' in obj:
+            obj['customer']['id'] = number
+        out.append(row)
+    return out
+
+
+def run(rows=ROWS, repeat=3):
+    """
+    Time ``process_result`` in each mode and return rows per second.
+    """
+    results = {}
+    for name, model in (('subscriptions', Subscription('1234', 'bench')),
+                        ('products', Product('1234', 'bench'))):
+        content = load_rows(name, rows)
+        for mode, kwargs in (('models', {}),
+                             ('lazy', {'lazy': True}),
+                             ('compact', {'compact': True})):
+            seconds = min(timeit.repeat(
+                lambda: model.process_result(content, **kwargs),
+                number=1, repeat=repeat))
+            results['{0}.{1}'.format(name, mode)] = rows / seconds
+    return results
+
+
+def main():
+    for name, rate in sorted(run().items()):
+        print('{0:<24} {1:10.0f} rows/s'.format(name, rate))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark for building the request bodies of :meth:`Model.save`.
+
+Times :meth:`pychargify.models.Model._save_payload` plus JSON encoding
+for new objects (every writable field) and for updates (changed fields
+only)::
+
+    python -m benchmarks.bench_save
+"""
+from __future__ import print_function
+
+import timeit
+
+from pychargify.api import Customer, Product
+from pychargify.serializers import get_codec
+
+from benchmarks.bench_parse import load_rows
+
+
+def run(number=20000, repeat=3):
+    """
+    Time payload building and return payloads per second.
+    """
+    codec = get_codec()
+    customer = Customer('1234', 'bench').parse(
+        load_rows('subscriptions', 1)[0]['subscription']['customer'])
+    customer.id = None
+    product = Product('1234', 'bench').parse(
+        load_rows('products', 1)[0]['product'])
+    product.id = None
+
+    updated = Customer('1234', 'bench').parse(customer.raw_content)
+    updated.email = 'changed@example.com'
+
+    results = {}
+    for name, obj in (('customer.create', customer),
+                      ('product.create', product),
+                      ('customer.update', updated)):
+        key = obj._meta.key
+        seconds = min(timeit.repeat(
+            lambda: codec.dumps(obj._save_payload(key)),
+            number=number, repeat=repeat))
+        results[name] = number / seconds
+    return results
+
+
+def main():
+    for name, rate in sorted(run().items()):
+        print('{0:<18} {1:10.0f} payloads/s'.format(name, rate))
+
+
+if __name__ == '__main__':
+    main()
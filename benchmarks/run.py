@@ -0,0 +1,132 @@
+"""
+Run every benchmark and write the results as JSON.
+
+Each result is a flat ``name -> {"value", "unit", "better"}`` entry so
+files from different commits can be compared::
+
+    python -m benchmarks.run --output before.json
+    git checkout my-branch
+    python -m benchmarks.run --output after.json --compare before.json
+
+``--compare`` prints the change of every metric and exits with status 1
+when one regressed by more than ``--threshold`` (10% by default).
+"""
+from __future__ import print_function
+
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+
+from benchmarks import bench_dates, bench_http, bench_parse, bench_save
+
+
+HIGHER = 'higher'
+LOWER = 'lower'
+
+
+def git_commit():
+    """
+    Commit of the working tree, if it is a git checkout.
+    """
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'],
+            stderr=subprocess.STDOUT).decode('ascii').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def collect(quick=False):
+    """
+    Run the benchmarks and return their flattened results.
+    """
+    scale = 10 if quick else 1
+    results = {}
+
+    def add(name, value, unit, better=HIGHER):
+        results[name] = {'value': value, 'unit': unit, 'better': better}
+
+    for name, value in bench_parse.run(
+            rows=bench_parse.ROWS // scale, repeat=5).items():
+        add('parse.{0}'.format(name), value, 'rows/s')
+
+    for name, value in bench_dates.run(number=20000 // scale).items():
+        # dateutil is the reference the fast path is measured against
+        if name != 'dateutil':
+            add('dates.{0}'.format(name), value * 1e6, 'us/date', LOWER)
+
+    for name, value in bench_save.run(number=20000 // scale).items():
+        add('save_payload.{0}'.format(name), value, 'payloads/s')
+
+    for name, stats in bench_http.run(requests=1000 // scale).items():
+        add('http.{0}.throughput'.format(name),
+            stats['requests_per_second'], 'req/s')
+        for key in ('p50_ms', 'p90_ms', 'p99_ms'):
+            add('http.{0}.{1}'.format(name, key[:3]), stats[key], 'ms', LOWER)
+
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Print the change of each metric against ``baseline`` and return the
+    names of those that regressed by more than ``threshold``.
+    """
+    regressions = []
+    for name in sorted(results):
+        if name not in baseline:
+            continue
+        old = baseline[name]['value']
+        new = results[name]['value']
+        if not old:
+            continue
+        change = (new - old) / old
+        if results[name]['better'] == LOWER:
+            change = -change
+        flag = ''
+        if change < -threshold:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print('{0:<40} {1:12.2f} -> {2:12.2f} {3:<10} {4:+7.1%}{5}'.format(
+            name, old, new, results[name]['unit'], change, flag))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run pychargify benchmarks')
+    parser.add_argument('--output', help='write the results to this file')
+    parser.add_argument('--compare', help='results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10)
+    parser.add_argument('--quick', action='store_true',
+                        help='run a tenth of the iterations')
+    args = parser.parse_args(argv)
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'quick': args.quick,
+        'results': collect(args.quick),
+    }
+
+    if args.output:
+        with open(args.output, 'w') as file_:
+            json.dump(report, file_, indent=2, sort_keys=True)
+    else:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        print()
+
+    if args.compare:
+        with open(args.compare) as file_:
+            baseline = json.load(file_)['results']
+        if compare(report['results'], baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
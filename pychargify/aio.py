@@ -0,0 +1,389 @@
+# -*- coding: utf-8 -*-
+"""
+asyncio variants of the Chargify client and models.
+
+Requires Python 3.6+ and ``aiohttp``. The models reuse the field
+definitions, Meta options and parsing of :mod:`pychargify.api`; only the
+HTTP layer is awaitable::
+
+    async with Chargify('YOUR-API-KEY', 'YOUR-SUB-DOMAIN') as chargify:
+        customers = await chargify.customer().get()
+"""
+import time
+import asyncio
+
+from pychargify import api, exceptions, models
+from pychargify.instrumentation import NULL_INSTRUMENT
+from pychargify.scheduler import RequestScheduler
+from pychargify.serializers import get_codec
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+
+class Response(object):
+    """
+    Fully read HTTP response, exposing the parts of the ``requests``
+    response API the models rely on.
+    """
+    def __init__(self, status_code, url, headers, content):
+        self.status_code = status_code
+        self.url = url
+        self.headers = headers
+        self.content = content
+
+
+class AsyncSingleFlight(object):
+    """
+    asyncio counterpart of :class:`pychargify.coalesce.SingleFlight`.
+    """
+    def __init__(self):
+        self.calls = {}
+
+    async def do(self, key, func, *args, **kwargs):
+        """
+        Await ``func(*args, **kwargs)`` unless a call for ``key`` is in
+        flight, in which case share its outcome.
+        """
+        future = self.calls.get(key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = self.calls[key] = asyncio.get_event_loop().create_future()
+        try:
+            result = await func(*args, **kwargs)
+        except BaseException as error:
+            future.set_exception(error)
+            # retrieved here so a call nobody waited for does not warn
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self.calls[key]
+
+
+class AsyncTransport(object):
+    """
+    Pooled ``aiohttp`` session shared by the asyncio models of a client.
+
+    The session is created on first use so the transport can be built
+    outside of a running event loop.
+    """
+    def __init__(self, pool_size=10, keep_alive=True, timeout=None,
+                 scheduler=None, codec=None, cache=None, coalesce=False,
+                 base_url=None, instrument=None):
+        if aiohttp is None:
+            raise exceptions.ChargifyError(
+                'aiohttp is required for the asyncio client')
+
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+        self.scheduler = scheduler or RequestScheduler()
+        self.codec = get_codec(codec)
+        self.cache = cache
+        self.coalescer = AsyncSingleFlight() if coalesce else None
+        self.base_url = base_url
+        self.instrument = instrument or NULL_INSTRUMENT
+        self.session = None
+        self.loop = None
+
+    def _get_session(self):
+        loop = asyncio.get_event_loop()
+        # a session only works on the loop it was created on
+        if (self.session is None or self.session.closed or
+                self.loop is not loop):
+            connector = aiohttp.TCPConnector(
+                limit_per_host=self.pool_size,
+                force_close=not self.keep_alive)
+            self.session = aiohttp.ClientSession(connector=connector)
+            self.loop = loop
+        return self.session
+
+    def _timeout(self, timeout):
+        if timeout is None:
+            return aiohttp.ClientTimeout()
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return aiohttp.ClientTimeout(connect=connect, sock_read=read)
+        return aiohttp.ClientTimeout(total=timeout)
+
+    async def request(self, method, url, auth=None, headers=None,
+                      params=None, data=None, timeout=None):
+        """
+        Perform an HTTP request and read the whole body.
+
+        Takes the same arguments as
+        :meth:`pychargify.transport.Transport.request`.
+        """
+        if auth is not None:
+            auth = aiohttp.BasicAuth(*auth)
+        if params:
+            params = dict((key, str(value)) for key, value in params.items())
+
+        scheduler = self.scheduler
+        instrument = self.instrument
+        attempt = 0
+
+        while True:
+            delay = scheduler.acquire(url, attempt)
+            if delay:
+                await asyncio.sleep(delay)
+
+            if instrument.enabled:
+                instrument.before_request(method, url)
+                started = time.time()
+
+            try:
+                response = await self._send(
+                    method, url, auth=auth, headers=headers, params=params,
+                    data=data, timeout=self._timeout(timeout or self.timeout))
+            except (aiohttp.ClientConnectionError,
+                    asyncio.TimeoutError) as error:
+                if instrument.enabled:
+                    instrument.after_request(
+                        method, url, None, time.time() - started,
+                        len(data or b''), error=error)
+                delay = scheduler.retry_delay(method, attempt, error=error)
+                if delay is None:
+                    raise
+            else:
+                if instrument.enabled:
+                    seconds = time.time() - started
+                    instrument.after_request(
+                        method, url, response.status_code, seconds,
+                        len(data or b''), len(response.content))
+                    if instrument.profile:
+                        instrument.request_phases(
+                            method, url, None, seconds, 0.0)
+                delay = scheduler.retry_delay(
+                    method, attempt, response.status_code, response.headers)
+                if delay is None:
+                    return response
+
+            if instrument.enabled:
+                instrument.retry(method, url, attempt, delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _send(self, method, url, **kwargs):
+        async with self._get_session().request(method, url, **kwargs) as resp:
+            content = await resp.read()
+            return Response(resp.status, str(resp.url), resp.headers, content)
+
+    async def close(self):
+        """
+        Close every pooled connection.
+        """
+        if self.session is not None:
+            await self.session.close()
+
+
+_DEFAULT_TRANSPORT = []
+
+
+def default_transport():
+    """
+    Transport shared by the asyncio models created without one, e.g.
+    ``aio.Customer(api_key, sub_domain)``. Close it with
+    ``await default_transport().close()``.
+    """
+    if not _DEFAULT_TRANSPORT:
+        _DEFAULT_TRANSPORT.append(AsyncTransport())
+    return _DEFAULT_TRANSPORT[0]
+
+
+class AsyncModel(object):
+    """
+    Mixin replacing the blocking HTTP layer of
+    :class:`pychargify.models.Model` with coroutines.
+    """
+    def __init__(self, apikey, subdomain, transport=None):
+        super(AsyncModel, self).__init__(
+            apikey, subdomain, transport or default_transport())
+
+    async def _request(self, method, url, payload=None, params=None,
+                       **headers_kwargs):
+        response = await self.transport.request(
+            method, **self._request_kwargs(
+                url, payload, params, **headers_kwargs))
+
+        models.check_response_code(response.status_code)
+        return response
+
+    async def _get(self, url, params=None, **headers_kwargs):
+        response = await self._request(
+            'GET', url, params=params, **headers_kwargs)
+
+        if response.url.endswith('.pdf'):
+            return response
+        return self._decode(response)
+
+    async def _post(self, url, payload):
+        return self._decode(await self._request('POST', url, payload))
+
+    async def _put(self, url, payload):
+        return self._decode(await self._request('PUT', url, payload))
+
+    async def _save(self, url, node_name):
+        payload = self._save_payload(node_name)
+
+        # pylint: disable=E1101
+        if self.id:
+            return await self._put(url, payload)
+
+        return await self._post(url, payload)
+
+    async def _read(self, url, params=None, compact=False, lazy=False):
+        coalescer = getattr(self.transport, 'coalescer', None)
+        if coalescer is None:
+            return await self._read_through(url, params, compact, lazy)
+
+        return await coalescer.do(
+            (self._cache_key(url, params), compact, lazy),
+            self._read_through, url, params, compact, lazy)
+
+    async def _read_through(self, url, params=None, compact=False,
+                            lazy=False):
+        lookup = self._cache_lookup(url, params, compact, lazy)
+        if lookup.hit:
+            return lookup.result
+
+        response = await self._request(
+            'GET', url, params=params, **lookup.conditional_headers())
+        return self._cache_store(lookup, response, compact, lazy)
+
+    async def get(self, object_id=None):
+        """
+        See :meth:`pychargify.models.Model.get`.
+        """
+        return await self._read(self.setup_url(obj_id=object_id))
+
+    async def iter_all(self, per_page=200, start_page=1):
+        """
+        Asynchronous generator over every page of the list endpoint,
+        ending on an empty page or one repeating the previous page.
+        """
+        page = start_page
+        previous = None
+        while True:
+            content = await self._get_page(self.setup_url(), page, per_page)
+            if not content:
+                return
+            ids = self._page_ids(content)
+            if ids == previous:
+                return
+            for obj in self.process_result(content):
+                yield obj
+            previous = ids
+            page += 1
+
+    async def save(self):
+        """
+        See :meth:`pychargify.models.Model.save`.
+        """
+        # pylint: disable=E1101
+        if self.id and not self.changed_fields():
+            return self
+
+        obj = await self._save(self._save_url(), self._meta.key)
+        self._invalidate_cache()
+        return self.parse(obj.get(self._meta.key), create_new_class=False)
+
+
+class Customer(AsyncModel, api.Customer):
+    """
+    asyncio variant of :class:`pychargify.api.Customer`
+    """
+    async def get_by_reference(self, reference):
+        """
+        Get a user by their reference name
+        """
+        return await self._read(
+            'customers/lookup.json', params={'reference': reference})
+
+
+class Product(AsyncModel, api.Product):
+    """
+    asyncio variant of :class:`pychargify.api.Product`
+    """
+
+
+class Subscription(AsyncModel, api.Subscription):
+    """
+    asyncio variant of :class:`pychargify.api.Subscription`
+    """
+    async def get(self, object_id=None, customer_id=None):
+        """
+        Subscriptions can be fetched by subscription or customer id.
+        """
+        if not customer_id:
+            return await super(Subscription, self).get(object_id=object_id)
+
+        url = 'customers/{0}/subscriptions.json'.format(customer_id)
+        return await self._read(url)
+
+    async def get_statements(self, object_id=None, get_list=False):
+        return await self._get(self._statements_url(object_id, get_list))
+
+    async def get_statement(self, object_id, get_pdf=False):
+        url, headers = self._statement_request(object_id, get_pdf)
+        return await self._get(url, **headers)
+
+    def iter_statement_pdf(self, object_id, chunk_size=65536):
+        """
+        Not available: the asyncio transport reads whole bodies. Use
+        ``await get_statement(object_id, get_pdf=True)`` and its
+        ``content`` instead.
+        """
+        raise exceptions.ChargifyError(
+            'statement streaming is not supported by the asyncio client, '
+            'use get_statement(object_id, get_pdf=True)')
+
+    def download_statement(self, object_id, destination, chunk_size=65536,
+                           get_pdf=True):
+        """
+        Not available, see :meth:`iter_statement_pdf`.
+        """
+        self.iter_statement_pdf(object_id, chunk_size)
+
+
+class Chargify(api.Chargify):
+    """
+    asyncio entry point to the Chargify API
+    """
+    transport_class = AsyncTransport
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """
+        Close the pooled connections held by this client.
+        """
+        await self.transport.close()
+
+    def customer(self, nodename=''):
+        """
+        Shortcut method to get the ``Customer`` object
+        """
+        return Customer(self.api_key, self.sub_domain, self.transport)
+
+    def product(self, nodename=''):
+        """
+        Shortcut method to get the ``Product`` object
+        """
+        return Product(self.api_key, self.sub_domain, self.transport)
+
+    def subscription(self, nodename=''):
+        """
+        Shortcut method to get the ``Subscription`` object
+        """
+        return Subscription(self.api_key, self.sub_domain, self.transport)
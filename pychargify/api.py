@@ -18,8 +18,23 @@ Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
 Created on Nov 20, 2009
 Author: Paul Trippett (paul@pyhub.com)
 '''
+import os
 import json
 from pychargify import models
+from pychargify.instrumentation import MultiInstrument
+from pychargify.profiling import Profiler
+from pychargify.transport import Transport
+
+
+def _write_chunks(chunks, file_):
+    """
+    Write ``chunks`` to ``file_`` and return the number of bytes written.
+    """
+    written = 0
+    for chunk in chunks:
+        file_.write(chunk)
+        written += len(chunk)
+    return written
 
 
 class Customer(models.Model):
@@ -60,12 +75,8 @@ class Customer(models.Model):
         """
         Get a user by their reference name
         """
-        self._meta.url = 'customers/lookup.json?reference={0}'.format(
-            reference)
-        content = self.get()
-        # fix this
-        self._meta.url = 'customers.json'
-        return content
+        return self._read(
+            'customers/lookup.json', params={'reference': reference})
 
     # def get_subscriptions(self):
     #     obj = ChargifySubscription(self.api_key, self.sub_domain)
@@ -103,6 +114,7 @@ class Product(models.Model):
         key = 'product'
         required_fields = ()
         read_only_fields = ('id', )
+        cache_ttl = 300
 
     def __unicode__(self):
         return self.name
@@ -154,24 +166,94 @@ class Subscription(models.Model):
             'product': 'Product',
             # 'credit_card': 'ChargifyCreditCard'
         }
+        # Orders the list endpoint accepts for ``sort``
+        sort_fields = ('signup_date', 'period_start', 'period_end',
+                       'next_assessment', 'updated_at', 'created_at')
 
     def __unicode__(self):
         # pylint: disable=E1101
         return u'{0}-{1}'.format(
             self.product.__unicode__(), self.customer.__unicode__())
 
-    def get(self, object_id=None, customer_id=None):
+    def get(self, object_id=None, customer_id=None, prefetch=0,
+            per_page=200, compact=False, lazy=False):
         """
         Subscriptions can be fetched by subscription or customer id.
+
+        See :meth:`pychargify.models.Model.get` for the other arguments.
         """
         if not customer_id:
-            return super(Subscription, self).get(object_id=object_id)
+            return super(Subscription, self).get(
+                object_id=object_id, prefetch=prefetch, per_page=per_page,
+                compact=compact, lazy=lazy)
 
         url = 'customers/{0}/subscriptions.json'.format(customer_id)
-        content = self._get(url)
-        return self.process_result(content)
+        if prefetch:
+            return self._iter_all(url, per_page, 1, prefetch, compact, lazy)
+
+        return self._read(url, compact=compact, lazy=lazy)
+
+    def iter_all(self, per_page=200, start_page=1, prefetch=0,
+                 compact=False, lazy=False, customer_id=None):
+        """
+        Lazily walk every subscription, or every subscription of
+        ``customer_id``, one page at a time.
+        """
+        if not customer_id:
+            return super(Subscription, self).iter_all(
+                per_page=per_page, start_page=start_page, prefetch=prefetch,
+                compact=compact, lazy=lazy)
+
+        url = 'customers/{0}/subscriptions.json'.format(customer_id)
+        return self._iter_all(
+            url, per_page, start_page, prefetch, compact, lazy)
 
     def get_statements(self, object_id=None, get_list=False):
+        return self._get(self._statements_url(object_id, get_list))
+
+    def get_statement(self, object_id, get_pdf=False):
+        url, headers = self._statement_request(object_id, get_pdf)
+        return self._get(url, **headers)
+
+    def iter_statement_pdf(self, object_id, chunk_size=65536):
+        """
+        Generator of the PDF of a statement, ``chunk_size`` bytes at a time.
+        """
+        url, headers = self._statement_request(object_id, get_pdf=True)
+        return self._get_stream(url, chunk_size=chunk_size, **headers)
+
+    def download_statement(self, object_id, destination, chunk_size=65536,
+                           get_pdf=True):
+        """
+        Stream the PDF (or with ``get_pdf=False`` the JSON) of a statement
+        to ``destination``, a path or a file object opened in binary mode,
+        and return the number of bytes written.
+
+        A path is written to a temporary file next to it and renamed once
+        complete, so it never holds a partial download.
+        """
+        url, headers = self._statement_request(object_id, get_pdf)
+        chunks = self._get_stream(url, chunk_size=chunk_size, **headers)
+        if hasattr(destination, 'write'):
+            return _write_chunks(chunks, destination)
+
+        tmp_path = '{0}.part'.format(destination)
+        try:
+            with open(tmp_path, 'wb') as file_:
+                written = _write_chunks(chunks, file_)
+            os.rename(tmp_path, destination)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return written
+
+    @staticmethod
+    def _statements_url(object_id=None, get_list=False):
+        """
+        URL listing the statements (or statement ids) of a subscription,
+        or every statement id on the account.
+        """
         if object_id:
             if not get_list:
                 url = 'subscriptions/{0}/statements.json'.format(object_id)
@@ -179,9 +261,13 @@ class Subscription(models.Model):
                 url = 'subscriptions/{0}/statements/ids.json'.format(object_id)
         else:
             url = 'statements/ids.json'
-        return self._get(url)
+        return url
 
-    def get_statement(self, object_id, get_pdf=False):
+    @staticmethod
+    def _statement_request(object_id, get_pdf=False):
+        """
+        URL and extra headers for fetching a single statement.
+        """
         url = 'statements/{0}.json'.format(object_id)
         headers = {}
         if get_pdf:
@@ -190,8 +276,7 @@ class Subscription(models.Model):
                 'Accept': 'application/pdf',
                 'content-type': 'application/pdf'
             })
-
-        return self._get(url, **headers)
+        return url, headers
 
 
 # class CreditCard(models.Model):
@@ -244,39 +329,39 @@ class Subscription(models.Model):
 #             self.__name__, "subscription")
 
 
-# class PostBack(models.Model):
-#     """
-#     Represents Chargify API Post Backs
-#     """
-#     subscriptions = []
-
-#     def __init__(self, apikey, subdomain, postback_data):
-#         super(PostBack, self).__init__(apikey, subdomain)
-#         if postback_data:
-#             self._process_postback_data(postback_data)
-
-#     def _process_postback_data(self, data):
-#         """
-#         Process the Json array and fetches the Subscription Objects
-#         """
-#         csub = ChargifySubscription(self.api_key, self.sub_domain)
-#         postdata_objects = json.loads(data)
-#         for obj in postdata_objects:
-#             self.subscriptions.append(csub.getBySubscriptionId(obj))
-
-
 class Chargify(object):
     """
     The Chargify class provides the main entry point to the Chargify API
     """
     api_key = ''
     sub_domain = ''
+    transport_class = Transport
 
-    def __init__(self, api_key=None, sub_domain=None, cred_file=None):
+    def __init__(self, api_key=None, sub_domain=None, cred_file=None,
+                 pool_size=10, keep_alive=True, timeout=None,
+                 scheduler=None, codec=None, cache=None, coalesce=False,
+                 base_url=None, instrument=None, profile=False):
         '''
         We take either an api_key and sub_domain, or a path
         to a file with JSON that defines those two, or we throw
         an error.
+
+        ``pool_size``, ``keep_alive``, ``timeout``, ``scheduler`` and
+        ``codec`` configure the :class:`pychargify.transport.Transport`
+        shared by every model this client hands out. Pass a
+        :class:`pychargify.scheduler.RequestScheduler` to rate limit or
+        tune retries, ``codec='auto'`` to decode with orjson or ujson
+        when installed, and a :class:`pychargify.cache.LocMemCache` (or
+        another :class:`pychargify.cache.BaseCache`) as ``cache`` to read
+        slow-changing resources such as products through it. ``coalesce``
+        makes identical concurrent GETs share one request; the parsed
+        models are then shared by every caller. ``base_url`` points the
+        client somewhere other than ``https://<sub_domain>.chargify.com``,
+        such as a :class:`pychargify.stub.StubServer`. ``instrument``, e.g.
+        a :class:`pychargify.instrumentation.Metrics`, records timings and
+        counters of every request. ``profile`` attaches a
+        :class:`pychargify.profiling.Profiler`, available as ``profiler``,
+        breaking each call down into network, decode and parse phases.
         '''
         if api_key and sub_domain:
             self.api_key = api_key
@@ -291,23 +376,42 @@ class Chargify(object):
                   "or credential file. Exiting.")
             exit()
 
+        self.profiler = None
+        if profile:
+            self.profiler = Profiler()
+            if instrument is not None:
+                instrument = MultiInstrument(instrument, self.profiler)
+            else:
+                instrument = self.profiler
+
+        self.transport = self.transport_class(
+            pool_size=pool_size, keep_alive=keep_alive, timeout=timeout,
+            scheduler=scheduler, codec=codec, cache=cache, coalesce=coalesce,
+            base_url=base_url, instrument=instrument)
+
+    def close(self):
+        """
+        Close the pooled connections held by this client.
+        """
+        self.transport.close()
+
     def customer(self, nodename=''):
         """
         Shortcut method to get the ``Customer`` object
         """
-        return Customer(self.api_key, self.sub_domain, nodename)
+        return Customer(self.api_key, self.sub_domain, self.transport)
 
     def product(self, nodename=''):
         """
         Shortcut method to get the ``Product`` object
         """
-        return Product(self.api_key, self.sub_domain, nodename)
+        return Product(self.api_key, self.sub_domain, self.transport)
 
     def subscription(self, nodename=''):
         """
         Shortcut method to get the ``Subscription`` object
         """
-        return Subscription(self.api_key, self.sub_domain, nodename)
+        return Subscription(self.api_key, self.sub_domain, self.transport)
 
     # def credit_card(self, nodename=''):
     #     """
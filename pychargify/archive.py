@@ -0,0 +1,160 @@
+"""
+Bulk statement archiving.
+
+Statements are downloaded concurrently into a directory, one file per
+statement and format::
+
+    archiver = StatementArchiver(chargify.subscription(), '/srv/statements')
+    report = archiver.run()
+    print(report.downloaded, report.bytes_per_second)
+
+Files are only renamed into place once complete, so a run that is
+interrupted (or partly fails) is resumed by running it again: statements
+already archived are skipped.
+"""
+import os
+import time
+
+import requests
+
+from pychargify import exceptions
+from pychargify.bulk import bounded_map
+
+
+FORMATS = ('json', 'pdf')
+
+
+class ArchiveReport(object):
+    """
+    Outcome of a :meth:`StatementArchiver.run`.
+
+    ``failed`` maps ``(statement_id, format)`` to the error raised for it:
+    a :class:`pychargify.exceptions.ChargifyError`, a connection error
+    left after retries or an ``IOError`` writing the file.
+    """
+    def __init__(self):
+        self.downloaded = 0
+        self.skipped = 0
+        self.failed = {}
+        self.bytes = 0
+        self.seconds = 0.0
+
+    @property
+    def files_per_second(self):
+        return self.downloaded / self.seconds if self.seconds else 0.0
+
+    @property
+    def bytes_per_second(self):
+        return self.bytes / self.seconds if self.seconds else 0.0
+
+
+class StatementArchiver(object):
+    """
+    Downloads statements into ``directory`` as ``<id>.json`` and/or
+    ``<id>.pdf`` with at most ``workers`` downloads in flight.
+
+    ``subscription`` is a :class:`pychargify.api.Subscription` whose
+    credentials and transport are used.
+    """
+    def __init__(self, subscription, directory, formats=FORMATS, workers=4,
+                 per_page=1000, chunk_size=65536):
+        for format_ in formats:
+            if format_ not in FORMATS:
+                raise ValueError(
+                    'Unknown statement format {0!r}'.format(format_))
+
+        self.subscription = subscription
+        self.directory = directory
+        self.formats = tuple(formats)
+        self.workers = workers
+        self.per_page = per_page
+        self.chunk_size = chunk_size
+
+    def statement_ids(self, subscription_ids=None):
+        """
+        Generator of the statement ids of ``subscription_ids``, or of every
+        statement on the account.
+        """
+        if subscription_ids is None:
+            urls = [self.subscription._statements_url()]
+        else:
+            urls = (self.subscription._statements_url(subscription_id,
+                                                      get_list=True)
+                    for subscription_id in subscription_ids)
+        for url in urls:
+            for statement_id in self._iter_ids(url):
+                yield statement_id
+
+    def _iter_ids(self, url):
+        """
+        Generator of the statement ids listed at ``url``, page by page.
+
+        Stops at an empty page, or at one repeating the previous page for
+        an endpoint that ignores ``page``.
+        """
+        page = 1
+        previous = None
+        while True:
+            ids = self.subscription._get(
+                url, params={'page': page, 'per_page': self.per_page}
+            )['statement_ids']
+            if not ids or ids == previous:
+                return
+            for statement_id in ids:
+                yield statement_id
+            previous = ids
+            page += 1
+
+    def path(self, statement_id, format_):
+        """
+        Where a statement is archived.
+        """
+        return os.path.join(
+            self.directory, '{0}.{1}'.format(statement_id, format_))
+
+    def run(self, subscription_ids=None, statement_ids=None):
+        """
+        Archive the statements of ``subscription_ids``, the given
+        ``statement_ids`` or, by default, every statement on the account,
+        and return an :class:`ArchiveReport`.
+        """
+        if statement_ids is None:
+            statement_ids = self.statement_ids(subscription_ids)
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+        report = ArchiveReport()
+        started = time.time()
+
+        def missing():
+            for statement_id in statement_ids:
+                for format_ in self.formats:
+                    if os.path.exists(self.path(statement_id, format_)):
+                        report.skipped += 1
+                    else:
+                        yield statement_id, format_
+
+        def download(item):
+            statement_id, format_ = item
+            return self.subscription.download_statement(
+                statement_id, self.path(statement_id, format_),
+                self.chunk_size, format_ == 'pdf')
+
+        try:
+            for item, future in bounded_map(
+                    download, missing(), self.workers):
+                self._collect(item, future, report)
+        finally:
+            report.seconds = time.time() - started
+
+        return report
+
+    @staticmethod
+    def _collect(item, future, report):
+        try:
+            report.bytes += future.result()
+        except (exceptions.ChargifyError, requests.RequestException,
+                EnvironmentError) as error:
+            report.failed[item] = error
+        else:
+            report.downloaded += 1
@@ -0,0 +1,74 @@
+"""
+Bulk saves.
+
+Chargify has no batch write endpoint, so each object is still one POST or
+PUT; :func:`save_many` keeps several of them in flight on the pooled
+transport instead of waiting on each round trip::
+
+    customers = [Customer(...), ...]
+    for result in save_many(customers, workers=8):
+        if result.error:
+            log(result.object, result.error)
+
+Requests go through the transport's scheduler, so its rate limit and
+retries apply to every write. :func:`bounded_map` is the bounded thread
+pool underneath, shared with the other bulk operations.
+"""
+import collections
+from concurrent import futures
+
+import requests
+
+from pychargify import exceptions
+
+
+SaveResult = collections.namedtuple('SaveResult', ('object', 'error'))
+
+
+def bounded_map(func, items, workers=4, backlog=None):
+    """
+    Call ``func(item)`` for each of ``items`` on a pool of ``workers``
+    threads, yielding ``(item, future)`` pairs in input order.
+
+    At most ``backlog`` calls (``workers * 2`` by default) are submitted
+    ahead of the consumer, so ``items`` may be a long or endless iterable.
+    Closing the generator cancels the calls not started yet and waits for
+    the running ones.
+    """
+    backlog = backlog or workers * 2
+    executor = futures.ThreadPoolExecutor(max_workers=workers)
+    pending = collections.deque()
+
+    try:
+        for item in items:
+            if len(pending) >= backlog:
+                yield pending.popleft()
+            pending.append((item, executor.submit(func, item)))
+
+        while pending:
+            yield pending.popleft()
+    finally:
+        for _, future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+def save_many(objs, workers=4):
+    """
+    Save every model of ``objs`` with at most ``workers`` requests in
+    flight, yielding a :class:`SaveResult` per object in input order.
+
+    An object that fails to save gets the error (e.g.
+    :class:`pychargify.exceptions.ChargifyUnProcessableEntity`) in its
+    result; the rest of the batch carries on.
+    """
+    for obj, future in bounded_map(lambda obj: obj.save(), objs, workers):
+        yield _result(obj, future)
+
+
+def _result(obj, future):
+    try:
+        future.result()
+    except (exceptions.ChargifyError, requests.RequestException) as error:
+        return SaveResult(obj, error)
+    return SaveResult(obj, None)
@@ -0,0 +1,140 @@
+"""
+Read-through response cache for slow-changing resources.
+
+Models opt in with a ``cache_ttl`` (in seconds) on their Meta class, or
+through the ``ttls`` of the cache itself, and read through the cache set
+on the client::
+
+    chargify = Chargify('YOUR-API-KEY', 'YOUR-SUB-DOMAIN',
+                        cache=LocMemCache(max_entries=500,
+                                          ttls={'Customer': 30}))
+
+Expired entries are revalidated with a conditional GET; a 304 reuses them
+without downloading or decoding the body again. Saving a model through
+:meth:`pychargify.models.Model.save` invalidates every cached entry of that
+model.
+"""
+import threading
+import collections
+
+
+class BaseCache(object):
+    """
+    Interface for cache backends.
+
+    Values are dicts holding the decoded JSON ``content`` of a response
+    and its metadata (expiry and the ``ETag``/``Last-Modified``
+    validators used to revalidate it once stale). Values are plain,
+    serializable data, so backends may be shared between processes
+    (memcached, redis, ...). Every hit parses the content into new models,
+    so callers never share mutable objects.
+    """
+
+    def __init__(self, ttls=None):
+        """
+        ``ttls`` maps model class names to a TTL overriding their
+        ``Meta.cache_ttl``; ``0`` disables caching for that model.
+        """
+        self.ttls = ttls or {}
+
+    def ttl_for(self, model):
+        """
+        Number of seconds responses of ``model`` stay fresh, or ``None``
+        if the model is not cached.
+        """
+        name = model.__class__.__name__
+        if name in self.ttls:
+            return self.ttls[name]
+        return getattr(model._meta, 'cache_ttl', None)
+
+    def get(self, key):
+        """
+        Return the value stored under ``key`` or ``None``.
+        """
+        raise NotImplementedError
+
+    def set(self, key, value, size=0):
+        """
+        Store ``value`` under ``key``. ``size`` is the size in bytes of the
+        response it was built from.
+        """
+        raise NotImplementedError
+
+    def delete(self, key):
+        """
+        Remove ``key`` from the cache.
+        """
+        raise NotImplementedError
+
+    def invalidate(self, prefix):
+        """
+        Remove every entry whose key starts with ``prefix``.
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        """
+        Remove every entry.
+        """
+        raise NotImplementedError
+
+
+class LocMemCache(BaseCache):
+    """
+    Thread-safe in-process LRU cache bounded by number of entries and,
+    optionally, by the total size of the cached responses.
+    """
+
+    def __init__(self, max_entries=1000, max_bytes=None, ttls=None):
+        super(LocMemCache, self).__init__(ttls=ttls)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = collections.OrderedDict()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        with self.lock:
+            item = self.entries.pop(key, None)
+            if item is None:
+                return None
+            # re-insert as most recently used
+            self.entries[key] = item
+            return item[0]
+
+    def set(self, key, value, size=0):
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old[1]
+
+            self.entries[key] = (value, size)
+            self.total_bytes += size
+            self._evict()
+
+    def _evict(self):
+        while self.entries and (
+                len(self.entries) > self.max_entries or
+                (self.max_bytes is not None and
+                 self.total_bytes > self.max_bytes)):
+            _, (_, size) = self.entries.popitem(last=False)
+            self.total_bytes -= size
+
+    def delete(self, key):
+        with self.lock:
+            item = self.entries.pop(key, None)
+            if item is not None:
+                self.total_bytes -= item[1]
+
+    def invalidate(self, prefix):
+        with self.lock:
+            for key in [key for key in self.entries if key.startswith(prefix)]:
+                self.total_bytes -= self.entries.pop(key)[1]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
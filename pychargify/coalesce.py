@@ -0,0 +1,63 @@
+"""
+Request coalescing: identical GETs issued concurrently share one upstream
+request.
+"""
+import sys
+import threading
+
+import six
+
+
+class Call(object):
+    """
+    An in-flight call and its outcome.
+    """
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.exc_info = None
+        self.waiters = 0
+
+
+class SingleFlight(object):
+    """
+    Runs at most one call per key at a time.
+
+    Callers asking for a key that is already in flight wait for that call
+    and get its result, or its exception re-raised, instead of running
+    their own.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        Run ``func(*args, **kwargs)`` unless a call for ``key`` is in
+        flight, in which case wait for it and share its outcome.
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = Call()
+            else:
+                call.waiters += 1
+
+        if not leader:
+            call.done.wait()
+            if call.exc_info is not None:
+                six.reraise(*call.exc_info)
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+        except BaseException:
+            call.exc_info = sys.exc_info()
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
+
+        return call.result
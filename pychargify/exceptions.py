@@ -63,6 +63,23 @@ class ChargifyUnProcessableEntity(ChargifyError):
     pass
 
 
+class ChargifyRateLimited(ChargifyError):
+    """
+    Returned when the API rate limit has been exceeded and retrying
+    did not help.
+    @license    GNU General Public License
+    """
+    pass
+
+
+class ChargifyInvalidSignature(ChargifyError):
+    """
+    Returned when a webhook's signature does not match its body.
+    @license    GNU General Public License
+    """
+    pass
+
+
 class ChargifyServerError(ChargifyError):
     """
     Signals some other error
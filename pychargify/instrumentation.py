@@ -0,0 +1,376 @@
+"""
+Request instrumentation.
+
+Transports call the hooks of their ``instrument`` around every HTTP
+attempt, and models report decode, parse and cache activity to it. The
+default :class:`Instrument` does nothing and is skipped entirely, so
+uninstrumented clients pay no timing overhead.
+
+:class:`Metrics` aggregates everything in memory and renders it in the
+Prometheus text format; :class:`StatsDInstrument` pushes it to StatsD::
+
+    metrics = Metrics()
+    chargify = Chargify(api_key, sub_domain, instrument=metrics)
+    ...
+    print(metrics.prometheus())
+
+Subclass :class:`Instrument` for custom before/after request hooks.
+"""
+import re
+import socket
+import bisect
+import threading
+import collections
+
+from six.moves.urllib.parse import urlparse
+
+
+# Upper bounds, in seconds, of the latency histogram buckets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0)
+
+_ID_SEGMENT = re.compile(r'/\d+(?=/|\.|$)')
+
+
+def endpoint(url):
+    """
+    Path of ``url`` with numeric ids replaced, e.g.
+    ``/customers/:id/subscriptions.json``, to group calls by endpoint.
+    """
+    return _ID_SEGMENT.sub('/:id', urlparse(url).path) or '/'
+
+
+class Instrument(object):
+    """
+    No-op instrument and base class of the others.
+
+    Hooks are only called when ``enabled`` is true, and the phase hooks
+    (:meth:`request_phases`, :meth:`nested_parsed`) only when ``profile``
+    is true as well.
+    """
+    enabled = False
+    profile = False
+
+    def before_request(self, method, url):
+        """
+        Called before each HTTP attempt, retries included.
+        """
+
+    def after_request(self, method, url, status_code, seconds,
+                      sent_bytes=0, received_bytes=0, error=None):
+        """
+        Called after each HTTP attempt with its status code, or ``None``
+        and the ``error`` when it failed to get a response.
+        """
+
+    def retry(self, method, url, attempt, delay):
+        """
+        Called when an attempt is about to be retried after ``delay``
+        seconds.
+        """
+
+    def decoded(self, model, seconds, size):
+        """
+        Called after a response body of ``size`` bytes was decoded for
+        ``model`` (a class name).
+        """
+
+    def parsed(self, model, seconds, rows):
+        """
+        Called after decoded content was turned into ``rows`` objects.
+        """
+
+    def cache_lookup(self, model, outcome):
+        """
+        Called for each read of a cached model; ``outcome`` is ``'hit'``,
+        ``'miss'``, ``'stale'`` or ``'revalidated'`` (a 304 on a stale
+        entry).
+        """
+
+    def request_phases(self, method, url, connect, ttfb, download):
+        """
+        Called after :meth:`after_request` with the seconds spent opening
+        a connection, waiting for the response headers and reading the
+        body. ``connect`` is ``None`` when it can't be measured.
+        """
+
+    def nested_parsed(self, model, seconds):
+        """
+        Called after a nested ``model`` (e.g. a subscription's customer)
+        was built.
+        """
+
+
+NULL_INSTRUMENT = Instrument()
+
+
+class MultiInstrument(Instrument):
+    """
+    Forwards every hook to each of ``instruments``.
+    """
+    def __init__(self, *instruments):
+        self.instruments = [item for item in instruments if item.enabled]
+        self.enabled = bool(self.instruments)
+        self.profile = any(item.profile for item in self.instruments)
+
+    def _forward(name):
+        def hook(self, *args, **kwargs):
+            for instrument in self.instruments:
+                getattr(instrument, name)(*args, **kwargs)
+        hook.__name__ = name
+        return hook
+
+    before_request = _forward('before_request')
+    after_request = _forward('after_request')
+    retry = _forward('retry')
+    decoded = _forward('decoded')
+    parsed = _forward('parsed')
+    cache_lookup = _forward('cache_lookup')
+    request_phases = _forward('request_phases')
+    nested_parsed = _forward('nested_parsed')
+    del _forward
+
+
+class Histogram(object):
+    """
+    Cumulative histogram over ``buckets`` upper bounds, Prometheus style.
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        """
+        ``(upper bound, count)`` pairs, ending with ``+Inf``.
+        """
+        out = []
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'), ), self.counts):
+            total += count
+            out.append((bound, total))
+        return out
+
+
+class EndpointStats(object):
+    """
+    Totals of the requests to one method and endpoint.
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.latency = Histogram(buckets)
+        self.statuses = collections.Counter()
+        self.sent_bytes = 0
+        self.received_bytes = 0
+        self.retries = 0
+        self.errors = 0
+
+
+class Metrics(Instrument):
+    """
+    Thread safe in-memory metrics: per endpoint latency histograms, byte
+    counts, status and retry counters, decode and parse time per model,
+    and cache lookups per model.
+    """
+    enabled = True
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.endpoints = {}
+        self.decode_time = {}
+        self.parse_time = {}
+        self.cache = collections.defaultdict(collections.Counter)
+
+    def _endpoint(self, method, url):
+        key = (method, endpoint(url))
+        stats = self.endpoints.get(key)
+        if stats is None:
+            stats = self.endpoints[key] = EndpointStats(self.buckets)
+        return stats
+
+    def _histogram(self, histograms, model):
+        histogram = histograms.get(model)
+        if histogram is None:
+            histogram = histograms[model] = Histogram(self.buckets)
+        return histogram
+
+    def after_request(self, method, url, status_code, seconds,
+                      sent_bytes=0, received_bytes=0, error=None):
+        with self.lock:
+            stats = self._endpoint(method, url)
+            stats.latency.observe(seconds)
+            stats.sent_bytes += sent_bytes
+            stats.received_bytes += received_bytes
+            if status_code is None:
+                stats.errors += 1
+            else:
+                stats.statuses[status_code] += 1
+
+    def retry(self, method, url, attempt, delay):
+        with self.lock:
+            self._endpoint(method, url).retries += 1
+
+    def decoded(self, model, seconds, size):
+        with self.lock:
+            self._histogram(self.decode_time, model).observe(seconds)
+
+    def parsed(self, model, seconds, rows):
+        with self.lock:
+            self._histogram(self.parse_time, model).observe(seconds)
+
+    def cache_lookup(self, model, outcome):
+        with self.lock:
+            self.cache[model][outcome] += 1
+
+    def cache_hit_ratio(self, model=None):
+        """
+        Share of cache reads served without a full response, for one
+        model or all of them; ``None`` before any read.
+        """
+        with self.lock:
+            counters = ([self.cache[model]] if model is not None
+                        else list(self.cache.values()))
+            hits = sum(c['hit'] + c['revalidated'] for c in counters)
+            total = sum(sum(c.values()) for c in counters)
+        return float(hits) / total if total else None
+
+    def slowest(self, count=10):
+        """
+        ``(method, endpoint, total seconds, requests)`` of the endpoints
+        that took the most time overall, slowest first.
+        """
+        with self.lock:
+            rows = [(method, path, stats.latency.sum, stats.latency.count)
+                    for (method, path), stats in self.endpoints.items()]
+        return sorted(rows, key=lambda row: row[2], reverse=True)[:count]
+
+    def prometheus(self, prefix='pychargify'):
+        """
+        The metrics in the Prometheus text exposition format.
+        """
+        lines = []
+
+        def header(name, kind, help_text):
+            lines.append('# HELP {0}_{1} {2}'.format(prefix, name, help_text))
+            lines.append('# TYPE {0}_{1} {2}'.format(prefix, name, kind))
+
+        def sample(name, labels, value):
+            label_text = ','.join(
+                '{0}="{1}"'.format(key, value_) for key, value_ in labels)
+            lines.append('{0}_{1}{{{2}}} {3}'.format(
+                prefix, name, label_text, _number(value)))
+
+        def histogram(name, labels, hist):
+            for bound, count in hist.cumulative():
+                sample(name + '_bucket',
+                       labels + [('le', _number(bound))], count)
+            sample(name + '_sum', labels, hist.sum)
+            sample(name + '_count', labels, hist.count)
+
+        with self.lock:
+            endpoints = sorted(self.endpoints.items())
+
+            header('request_duration_seconds', 'histogram',
+                   'Duration of HTTP attempts.')
+            for (method, path), stats in endpoints:
+                histogram('request_duration_seconds',
+                          [('method', method), ('endpoint', path)],
+                          stats.latency)
+
+            header('responses_total', 'counter', 'Responses by status.')
+            for (method, path), stats in endpoints:
+                for status, count in sorted(stats.statuses.items()):
+                    sample('responses_total', [
+                        ('method', method), ('endpoint', path),
+                        ('status', status)], count)
+
+            for name, attr, help_text in (
+                    ('request_bytes_total', 'sent_bytes', 'Bytes sent.'),
+                    ('response_bytes_total', 'received_bytes',
+                     'Bytes received.'),
+                    ('retries_total', 'retries', 'Retried attempts.'),
+                    ('request_errors_total', 'errors',
+                     'Attempts that got no response.')):
+                header(name, 'counter', help_text)
+                for (method, path), stats in endpoints:
+                    sample(name, [('method', method), ('endpoint', path)],
+                           getattr(stats, attr))
+
+            for name, histograms, help_text in (
+                    ('decode_seconds', self.decode_time,
+                     'Time decoding response bodies.'),
+                    ('parse_seconds', self.parse_time,
+                     'Time building models from decoded content.')):
+                header(name, 'histogram', help_text)
+                for model, hist in sorted(histograms.items()):
+                    histogram(name, [('model', model)], hist)
+
+            header('cache_lookups_total', 'counter', 'Cache reads by outcome.')
+            for model, counter in sorted(self.cache.items()):
+                for outcome, count in sorted(counter.items()):
+                    sample('cache_lookups_total',
+                           [('model', model), ('outcome', outcome)], count)
+
+        return '\n'.join(lines) + '\n'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class StatsDInstrument(Instrument):
+    """
+    Pushes every event to a StatsD server over UDP as it happens.
+
+    Endpoints become metric name segments, e.g.
+    ``pychargify.request.GET.customers.id.200``.
+    """
+    enabled = True
+
+    def __init__(self, host='127.0.0.1', port=8125, prefix='pychargify'):
+        self.address = (host, port)
+        self.prefix = prefix
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def _send(self, *lines):
+        data = '\n'.join(
+            '{0}.{1}'.format(self.prefix, line) for line in lines)
+        try:
+            self.socket.sendto(data.encode('utf-8'), self.address)
+        except socket.error:
+            pass
+
+    @staticmethod
+    def _name(method, url):
+        path = endpoint(url).strip('/').replace('.json', '')
+        path = re.sub(r'[^A-Za-z0-9]+', '.', path.replace(':id', 'id'))
+        return '{0}.{1}'.format(method, path.strip('.') or 'root')
+
+    def after_request(self, method, url, status_code, seconds,
+                      sent_bytes=0, received_bytes=0, error=None):
+        name = self._name(method, url)
+        self._send(
+            'request.{0}.{1}:1|c'.format(name, status_code or 'error'),
+            'request.{0}:{1:.3f}|ms'.format(name, seconds * 1000),
+            'request_bytes.{0}:{1}|c'.format(name, sent_bytes),
+            'response_bytes.{0}:{1}|c'.format(name, received_bytes))
+
+    def retry(self, method, url, attempt, delay):
+        self._send('retry.{0}:1|c'.format(self._name(method, url)))
+
+    def decoded(self, model, seconds, size):
+        self._send('decode.{0}:{1:.3f}|ms'.format(model, seconds * 1000))
+
+    def parsed(self, model, seconds, rows):
+        self._send('parse.{0}:{1:.3f}|ms'.format(model, seconds * 1000))
+
+    def cache_lookup(self, model, outcome):
+        self._send('cache.{0}.{1}:1|c'.format(model, outcome))
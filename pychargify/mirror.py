@@ -0,0 +1,223 @@
+"""
+Local SQLite mirror of Chargify objects.
+
+The mirror stores the raw JSON of parsed models and indexes it so common
+lookups are answered locally instead of over the network::
+
+    mirror = Mirror(chargify, '/var/lib/billing/chargify.db')
+    mirror.refresh()
+    customer = mirror.customer_by_reference('greg1')
+
+Keep it current by feeding it the models (or compact records) you fetch,
+e.g. the objects of a :class:`pychargify.sync.SyncEngine` run. Records
+only carry their model's declared fields, so that is all the mirror keeps
+of them.
+"""
+import json
+import sqlite3
+import datetime
+import itertools
+import threading
+
+from pychargify.models import Record
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS customers (
+    id INTEGER PRIMARY KEY,
+    reference TEXT,
+    email TEXT,
+    raw TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS customers_reference ON customers (reference);
+CREATE INDEX IF NOT EXISTS customers_email ON customers (email);
+
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    handle TEXT,
+    raw TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS products_handle ON products (handle);
+
+CREATE TABLE IF NOT EXISTS subscriptions (
+    id INTEGER PRIMARY KEY,
+    customer_id INTEGER,
+    product_id INTEGER,
+    state TEXT,
+    raw TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS subscriptions_customer
+    ON subscriptions (customer_id);
+"""
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    raise TypeError('{0!r} is not JSON serializable'.format(value))
+
+
+def _raw(obj):
+    """
+    ``(key, raw content)`` of a parsed model or compact record.
+    """
+    if isinstance(obj, Record):
+        return obj.model._meta.key, obj.as_dict()
+    return obj._meta.key, obj.raw_content
+
+
+class Mirror(object):
+    """
+    SQLite backed mirror of the customers, products and subscriptions of
+    a :class:`pychargify.api.Chargify` client. ``path`` defaults to an
+    in-memory database.
+    """
+    def __init__(self, chargify, path=':memory:'):
+        self.chargify = chargify
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        """
+        Close the database.
+        """
+        self.connection.close()
+
+    def add(self, obj):
+        """
+        Store a parsed ``Customer``, ``Product`` or ``Subscription``.
+        """
+        self.add_many([obj])
+
+    def add_many(self, objs):
+        """
+        Store parsed models or compact records in a single transaction.
+        Subscriptions also store their nested customer and product.
+
+        ``objs`` is read in full before the database is locked, so a slow
+        iterable does not hold up lookups.
+        """
+        rows = [_raw(obj) for obj in objs]
+        with self.lock:
+            with self.connection:
+                for key, raw in rows:
+                    if key == 'customer':
+                        self._store_customer(raw)
+                    elif key == 'product':
+                        self._store_product(raw)
+                    elif key == 'subscription':
+                        self._store_subscription(raw)
+
+    def refresh(self, per_page=200, prefetch=0):
+        """
+        Reload every customer, product and subscription from the API.
+
+        Each page is stored in its own transaction as it arrives, so
+        lookups keep being answered during a refresh and a failure keeps
+        the pages stored before it.
+        """
+        self.add_many(self.chargify.product().get())
+        for model in (self.chargify.customer(), self.chargify.subscription()):
+            objs = model.iter_all(per_page=per_page, prefetch=prefetch)
+            while True:
+                page = list(itertools.islice(objs, per_page))
+                if not page:
+                    break
+                self.add_many(page)
+
+    def _store_customer(self, raw):
+        self.connection.execute(
+            'INSERT OR REPLACE INTO customers (id, reference, email, raw) '
+            'VALUES (?, ?, ?, ?)',
+            (raw['id'], raw.get('reference'), raw.get('email'),
+             json.dumps(raw, default=_json_default)))
+
+    def _store_product(self, raw):
+        self.connection.execute(
+            'INSERT OR REPLACE INTO products (id, handle, raw) '
+            'VALUES (?, ?, ?)',
+            (raw['id'], raw.get('handle'),
+             json.dumps(raw, default=_json_default)))
+
+    def _store_subscription(self, raw):
+        customer = raw.get('customer') or {}
+        product = raw.get('product') or {}
+        if customer.get('id'):
+            self._store_customer(customer)
+        if product.get('id'):
+            self._store_product(product)
+
+        self.connection.execute(
+            'INSERT OR REPLACE INTO subscriptions '
+            '(id, customer_id, product_id, state, raw) VALUES (?, ?, ?, ?, ?)',
+            (raw['id'], customer.get('id'), product.get('id'),
+             raw.get('state'), json.dumps(raw, default=_json_default)))
+
+    def _select(self, model, sql, args):
+        with self.lock:
+            rows = self.connection.execute(sql, args).fetchall()
+        return [model.parse(json.loads(row[0])) for row in rows]
+
+    def _select_one(self, model, sql, args):
+        rows = self._select(model, sql, args)
+        return rows[0] if rows else None
+
+    def get_customer(self, customer_id):
+        """
+        Customer by id, or ``None``.
+        """
+        return self._select_one(
+            self.chargify.customer(),
+            'SELECT raw FROM customers WHERE id = ?', (customer_id, ))
+
+    def customer_by_reference(self, reference):
+        """
+        Customer by reference, or ``None``.
+        """
+        return self._select_one(
+            self.chargify.customer(),
+            'SELECT raw FROM customers WHERE reference = ?', (reference, ))
+
+    def customers_by_email(self, email):
+        """
+        Customers with the given email address.
+        """
+        return self._select(
+            self.chargify.customer(),
+            'SELECT raw FROM customers WHERE email = ? ORDER BY id',
+            (email, ))
+
+    def get_product(self, product_id):
+        """
+        Product by id, or ``None``.
+        """
+        return self._select_one(
+            self.chargify.product(),
+            'SELECT raw FROM products WHERE id = ?', (product_id, ))
+
+    def product_by_handle(self, handle):
+        """
+        Product by handle, or ``None``.
+        """
+        return self._select_one(
+            self.chargify.product(),
+            'SELECT raw FROM products WHERE handle = ?', (handle, ))
+
+    def get_subscription(self, subscription_id):
+        """
+        Subscription by id, or ``None``.
+        """
+        return self._select_one(
+            self.chargify.subscription(),
+            'SELECT raw FROM subscriptions WHERE id = ?', (subscription_id, ))
+
+    def subscriptions_for_customer(self, customer_id):
+        """
+        Subscriptions of a customer.
+        """
+        return self._select(
+            self.chargify.subscription(),
+            'SELECT raw FROM subscriptions WHERE customer_id = ? ORDER BY id',
+            (customer_id, ))
@@ -1,12 +1,23 @@
 """
 Chargify base models
 """
+import sys
+import copy
+import time
+import hashlib
 import six
-import json
-import requests
+import functools
+import itertools
+import collections
+import datetime
+import dateutil.tz
 import dateutil.parser
+from six.moves.urllib.parse import urlencode
 
 from pychargify import get_version, exceptions
+from pychargify.bulk import bounded_map
+from pychargify.instrumentation import NULL_INSTRUMENT
+from pychargify.transport import default_transport
 
 
 def headers():
@@ -40,11 +51,70 @@ def check_response_code(status_code):
     elif status_code == 422:
         raise exceptions.ChargifyUnProcessableEntity()
 
+    # Too Many Requests
+    elif status_code == 429:
+        raise exceptions.ChargifyRateLimited()
+
     # Generic Server Errors
-    elif status_code in [405, 500]:
+    elif status_code in [405, 500, 502, 503, 504]:
         raise exceptions.ChargifyServerError()
 
 
+_TZINFO_CACHE = {}
+
+# Field values that can be shared between instances without copying
+_IMMUTABLE_TYPES = (type(None), bool, float, tuple, datetime.datetime) + \
+    six.integer_types + six.string_types + (six.binary_type, )
+
+
+def _tzinfo(sign, hours, minutes):
+    """
+    Shared ``tzinfo`` for a UTC offset.
+    """
+    key = (sign, hours, minutes)
+    tzinfo = _TZINFO_CACHE.get(key)
+    if tzinfo is None:
+        offset = (int(hours) * 3600 + int(minutes) * 60)
+        if sign == '-':
+            offset = -offset
+        tzinfo = _TZINFO_CACHE[key] = (
+            dateutil.tz.tzutc() if not offset
+            else dateutil.tz.tzoffset(None, offset))
+    return tzinfo
+
+
+def parse_datetime(value):
+    """
+    Parse a date string from Chargify.
+
+    Chargify emits ``YYYY-MM-DDTHH:MM:SS+HH:MM`` (or a ``Z`` suffix);
+    that shape is decoded by slicing, anything else goes through
+    ``dateutil``.
+    """
+    length = len(value)
+    if ((length == 25 or length == 20) and value[4] == '-' and
+            value[7] == '-' and value[10] == 'T' and value[13] == ':' and
+            value[16] == ':'):
+        try:
+            if length == 20:
+                if value[19] != 'Z':
+                    raise ValueError(value)
+                tzinfo = _tzinfo('+', 0, 0)
+            else:
+                if value[19] not in '+-' or value[22] != ':':
+                    raise ValueError(value)
+                tzinfo = _tzinfo(value[19], value[20:22], value[23:25])
+
+            return datetime.datetime(
+                int(value[0:4]), int(value[5:7]), int(value[8:10]),
+                int(value[11:13]), int(value[14:16]), int(value[17:19]),
+                tzinfo=tzinfo)
+        except ValueError:
+            pass
+
+    return dateutil.parser.parse(value)
+
+
 class ChargifyField(object):
     """
     Base Field used in model
@@ -55,13 +125,30 @@ class ChargifyField(object):
     def __str__(self):
         return self.value
 
+    def clone(self):
+        """
+        Copy of this field, with its own copy of the default value, to
+        hold the value of a single model instance.
+        """
+        value = self.value
+        if not isinstance(value, _IMMUTABLE_TYPES):
+            value = copy.deepcopy(value)
+        return self.__class__(value=value)
+
     def to_python(self):
         """
         Create a python representation of the value.
+        """
+        return self.decode(self.value)
+
+    def decode(self, value):
+        """
+        Python representation of ``value``, without storing it on the
+        field.
 
         Override this to handle different data types.
         """
-        return self.value or u''
+        return value or u''
 
     def to_string(self):
         """
@@ -74,15 +161,73 @@ class ChargifyDateField(ChargifyField):
     """
     Converts Date strings from chargify into python datetime objects.
     """
-    def to_python(self):
-        if isinstance(self.value, six.text_type):
-            return dateutil.parser.parse(self.value) if self.value else None
-        return self.value
+    def decode(self, value):
+        if isinstance(value, six.text_type):
+            return parse_datetime(value) if value else None
+        return value
 
     def to_string(self):
         return '' if not self.value else self.to_python().isoformat()
 
 
+class Record(object):
+    """
+    Compact representation of a parsed model.
+
+    Each model gets a generated ``<Model>Record`` subclass with one slot
+    per field and no instance ``__dict__``. Credentials and the transport
+    are not copied onto records; they are shared through the model that
+    parsed them, so holding large result sets in memory costs a fraction
+    of the full models. Use :meth:`to_model` to get a full model back,
+    e.g. to save it.
+    """
+    __slots__ = ('_source', )
+    model = None
+
+    def __init__(self, source):
+        self._source = source
+
+    def __repr__(self):
+        return '<{0}: {1}>'.format(
+            self.__class__.__name__, getattr(self, 'id', ''))
+
+    def as_dict(self):
+        """
+        Return the field values as a dict, nested records included.
+        """
+        out = {}
+        for name in self.model._meta.fields:
+            value = getattr(self, name)
+            if isinstance(value, Record):
+                value = value.as_dict()
+            out[name] = value
+        return out
+
+    def to_model(self):
+        """
+        Build the full model instance this record represents.
+        """
+        source = self._source
+        obj = self.model(source.api_key, source.sub_domain, source.transport)
+        for name in self.model._meta.fields:
+            value = getattr(self, name)
+            if isinstance(value, Record):
+                value = value.to_model()
+            obj._set_field(name, value)
+        return obj
+
+
+def record_class(model):
+    """
+    Generate the :class:`Record` subclass holding the fields of ``model``.
+    """
+    return type(str('{0}Record'.format(model.__name__)), (Record, ), {
+        '__slots__': tuple(model._meta.fields),
+        '__module__': model.__module__,
+        'model': model,
+    })
+
+
 #pylint: disable=R0903
 class MetaClass(object):
     """
@@ -91,9 +236,16 @@ class MetaClass(object):
     def __init__(self, meta_cls, **kwargs):  # pylint: disable=W0142
         self.url = kwargs.pop('url')
         self.key = kwargs.pop('key')
-        self.fields = kwargs.pop('fields')
-        self.field_cache = {}
-        self.raw_content = None
+        self.field_map = kwargs.pop('field_map')
+        self.fields = list(self.field_map)
+        self.options = meta_cls
+        self.read_only_fields = ()
+        self.parse_plan = None
+
+        # Fields holding their decoded default, cloned by each instance
+        self.initial_fields = collections.OrderedDict(
+            (name, field.__class__(value=field.to_python()))
+            for name, field in self.field_map.items())
 
         for item in dir(meta_cls):
             if item not in ('__doc__', '__module__', '__weakref__'):
@@ -120,26 +272,75 @@ class ModelBase(type):
             return super_cls(cls, name, bases, attrs)
 
         module = attrs.pop('__module__')
-        new_class = super_cls(cls, name, bases, {'__module__': module})
+        new_attrs = {'__module__': module}
+        classcell = attrs.pop('__classcell__', None)
+        if classcell is not None:
+            new_attrs['__classcell__'] = classcell
+        new_class = super_cls(cls, name, bases, new_attrs)
 
         meta_attr = attrs.pop('Meta', None)
 
+        # Subclasses of a concrete model (e.g. the asyncio models) inherit
+        # its fields, and its Meta unless they declare their own.
+        base_meta = None
+        for parent in parents:
+            base_meta = getattr(parent, '_meta', None)
+            if base_meta is not None:
+                break
+
+        if meta_attr is None and base_meta is not None:
+            meta_attr = base_meta.options
+
         meta_kwargs = {
             'url': getattr(meta_attr, 'url', None),
             'key': getattr(meta_attr, 'key', None),
-            'fields': []
+            'field_map': collections.OrderedDict()
         }
 
-        for obj_name, obj in attrs.items():
-            setattr(new_class, obj_name, obj)
+        if base_meta is not None:
+            for field_name, field in base_meta.field_map.items():
+                meta_kwargs['field_map'][field_name] = field.clone()
 
+        # Fields live on _meta rather than on the class, so an instance
+        # attribute that has not been decoded yet falls through to
+        # __getattr__ (see ``Model.parse(lazy=True)``).
+        for obj_name, obj in attrs.items():
             if isinstance(obj, ChargifyField):
-                meta_kwargs['fields'].append(obj_name)
+                meta_kwargs['field_map'][obj_name] = obj
+            else:
+                setattr(new_class, obj_name, obj)
 
         setattr(new_class, '_meta', MetaClass(meta_attr, **meta_kwargs))
+        new_class._meta.record_class = record_class(new_class)
         return new_class
 
 
+class CacheLookup(object):
+    """
+    Outcome of looking a GET up in a model's cache.
+    """
+    def __init__(self, cache, key, ttl, entry=None):
+        self.cache = cache
+        self.key = key
+        self.ttl = ttl
+        self.entry = entry
+        self.hit = False
+        self.result = None
+
+    def conditional_headers(self):
+        """
+        ``If-None-Match``/``If-Modified-Since`` headers revalidating a
+        stale entry.
+        """
+        out = {}
+        if self.entry is not None:
+            if self.entry.get('etag'):
+                out['If-None-Match'] = self.entry['etag']
+            if self.entry.get('last_modified'):
+                out['If-Modified-Since'] = self.entry['last_modified']
+        return out
+
+
 class Model(six.with_metaclass(ModelBase)):
     """
     Model
@@ -148,36 +349,91 @@ class Model(six.with_metaclass(ModelBase)):
     sub_domain = ''
     base_host = '.chargify.com'
     request_host = ''
+    transport = None
+    raw_content = None
+    _fields = {}
 
-    def __init__(self, apikey, subdomain):
+    def __init__(self, apikey, subdomain, transport=None):
         """
         Initialize the Class with the API Key and SubDomain for Requests
-        to the Chargify API
+        to the Chargify API.
+
+        ``transport`` is the pooled :class:`pychargify.transport.Transport`
+        to send requests through. Models sharing a client share one.
+
+        Each instance gets its own copy of the class level fields, so
+        instances can be built and parsed from several threads at once.
+        Fields assigned after that are tracked as changed until the next
+        :meth:`parse` or :meth:`save`.
         """
         self.api_key = apikey
         self.sub_domain = subdomain
-        self.request_host = "https://{0}{1}".format(
-            self.sub_domain,
-            self.base_host
-        )
+        self.transport = transport or default_transport()
+        base_url = getattr(self.transport, 'base_url', None)
+        if base_url:
+            self.request_host = base_url.rstrip('/')
+        else:
+            self.request_host = "https://{0}{1}".format(
+                self.sub_domain,
+                self.base_host
+            )
 
-        fields = iter(self._meta.fields)
-        field_cache = self._meta.field_cache = {}
+        field_cache = self._fields = {}
+        self._changed = set()
+        values = self.__dict__
 
-        for field in fields:
-            field_cache.update({
-                field: getattr(self, field)
-            })
-            val = getattr(self, field).to_python()
-            setattr(self, field, val)
+        for name, field in self._meta.initial_fields.items():
+            field = field_cache[name] = field.clone()
+            values[name] = field.value
 
     def __setattr__(self, key, value):
-        if key in self._meta.field_cache:
-            field = self._meta.field_cache.get(key)
-            field.value = value
+        if key in self._fields:
+            self._changed.add(key)
+            self._set_field(key, value)
+        else:
+            super(Model, self).__setattr__(key, value)
+
+    def _set_field(self, key, value):
+        """
+        Store the value of field ``key`` without marking it as changed.
+        """
+        self._fields[key].value = value
+
+        pending = self.__dict__.get('_pending')
+        if pending:
+            pending.pop(key, None)
 
         super(Model, self).__setattr__(key, value)
 
+    def changed_fields(self):
+        """
+        Names of the writable fields assigned since the object was built,
+        parsed or saved.
+        """
+        return [name for name in self._meta.fields
+                if name in self._changed and
+                name not in self._meta.read_only_fields]
+
+    def __getattr__(self, name):
+        """
+        Decode fields left pending by a lazy :meth:`parse` on first access.
+        """
+        pending = self.__dict__.get('_pending')
+        if not pending or name not in pending:
+            raise AttributeError(name)
+
+        try:
+            value = pending.pop(name)
+        except KeyError:
+            # decoded by another thread in the meantime
+            if name in self.__dict__:
+                return self.__dict__[name]
+            raise AttributeError(name)
+
+        value = self._parse_field(name, value, lazy=True)
+        self._set_field(name, value)
+        return value
+
     def __repr__(self):
         return '<{0}: {1}>'.format(self.__class__.__name__, self.__unicode__())
 
@@ -204,93 +460,409 @@ class Model(six.with_metaclass(ModelBase)):
 
         return url
 
-    def process_result(self, content):
+    def process_result(self, content, compact=False, lazy=False):
         """
-        Turn the raw JSON into model classes
+        Turn the raw JSON into model classes, or into compact
+        :class:`Record` instances when ``compact`` is set. ``lazy`` defers
+        decoding of each field to its first access, see :meth:`parse`.
         """
+        instrument = self._instrument()
+        if not instrument.enabled:
+            return self._process_result(content, compact, lazy)
+
+        started = time.time()
+        result = self._process_result(content, compact, lazy)
+        instrument.parsed(
+            self.__class__.__name__, time.time() - started,
+            len(result) if isinstance(result, list) else 1)
+        return result
+
+    def _process_result(self, content, compact=False, lazy=False):
+        """
+        :meth:`process_result` without instrumentation.
+        """
+        if compact:
+            parse = self.parse_record
+        else:
+            parse = functools.partial(self.parse, lazy=lazy)
+
         if isinstance(content, list):
             out = []
             for obj in content:
-                out.append(self.parse(obj.get(self._meta.key)))
+                out.append(parse(obj.get(self._meta.key)))
             return out
         elif isinstance(content, dict):
             # single row
-            return self.parse(content.get(self._meta.key))
+            return parse(content.get(self._meta.key))
         else:
             return []
 
-    def get(self, object_id=None):
+    def _instrument(self):
+        """
+        The transport's :class:`pychargify.instrumentation.Instrument`.
+        """
+        return getattr(self.transport, 'instrument', NULL_INSTRUMENT)
+
+    def get(self, object_id=None, prefetch=0, per_page=200, compact=False,
+            lazy=False):
         """
         Performs an HTTP GET request.
 
         If an ``object_id`` keyword argument is present, the URL will be
         automatically changed to GET the specific ID.
+
+        Passing ``prefetch`` on a list request switches to bulk export
+        mode: every page is walked with ``prefetch`` pages fetched ahead
+        on a thread pool, and a generator of parsed models is returned.
+        ``compact`` returns :class:`Record` instances instead of models and
+        ``lazy`` decodes fields on first access, see :meth:`parse`.
         """
         url = self.setup_url(obj_id=object_id)
-        content = self._get(url)
-        return self.process_result(content)
+        if prefetch and not object_id:
+            return self._iter_all(url, per_page, 1, prefetch, compact, lazy)
+
+        return self._read(url, compact=compact, lazy=lazy)
+
+    def _read(self, url, params=None, compact=False, lazy=False):
+        """
+        GET ``url`` and parse the result.
+
+        When the transport coalesces requests, identical concurrent reads
+        (same URL, parameters and credentials) share one upstream request
+        and its parsed result.
+        """
+        coalescer = getattr(self.transport, 'coalescer', None)
+        if coalescer is None:
+            return self._read_through(url, params, compact, lazy)
+
+        return coalescer.do(
+            (self._cache_key(url, params), compact, lazy),
+            self._read_through, url, params, compact, lazy)
+
+    def _read_through(self, url, params=None, compact=False, lazy=False):
+        """
+        GET ``url`` and parse the result, reading through the transport's
+        cache when this model is cached.
+
+        Fresh hits are served without a request. Stale entries are
+        revalidated with their ``ETag`` or ``Last-Modified`` validators,
+        and their content reused on a 304. Only decoded content is cached,
+        so every read parses it into models of its own.
+        """
+        lookup = self._cache_lookup(url, params, compact, lazy)
+        if lookup.hit:
+            return lookup.result
+
+        response = self._request(
+            'GET', url, params=params, **lookup.conditional_headers())
+        return self._cache_store(lookup, response, compact, lazy)
+
+    def _cache_lookup(self, url, params, compact, lazy):
+        """
+        Look ``url`` up in the transport's cache.
+        """
+        cache = getattr(self.transport, 'cache', None)
+        ttl = cache.ttl_for(self) if cache is not None else None
+        if not ttl:
+            return CacheLookup(None, None, ttl)
+
+        key = self._cache_key(url, params)
+        entry = cache.get(key)
+        lookup = CacheLookup(cache, key, ttl, entry)
+
+        if entry is None:
+            outcome = 'miss'
+        elif entry['expires'] > time.time():
+            outcome = 'hit'
+            lookup.hit = True
+            lookup.result = self.process_result(
+                entry['content'], compact, lazy)
+        else:
+            outcome = 'stale'
+
+        instrument = self._instrument()
+        if instrument.enabled:
+            instrument.cache_lookup(self.__class__.__name__, outcome)
+        return lookup
+
+    def _cache_store(self, lookup, response, compact, lazy):
+        """
+        Parse a GET response and store it in the cache it was looked up in.
+
+        A 304 revalidates the looked up entry, whose content is then parsed
+        without being downloaded or decoded again. Only the decoded content
+        is cached: every read gets models of its own.
+        """
+        if response.status_code == 304 and lookup.entry is not None:
+            instrument = self._instrument()
+            if instrument.enabled:
+                instrument.cache_lookup(
+                    self.__class__.__name__, 'revalidated')
+            entry = lookup.entry
+            entry['expires'] = time.time() + lookup.ttl
+            lookup.cache.set(lookup.key, entry, size=entry.get('size', 0))
+            return self.process_result(entry['content'], compact, lazy)
+
+        content = self._decode(response)
+        result = self.process_result(content, compact, lazy)
+
+        if lookup.cache is not None:
+            entry = {
+                'content': content,
+                'expires': time.time() + lookup.ttl,
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'size': len(response.content),
+            }
+            lookup.cache.set(lookup.key, entry, size=entry['size'])
+        return result
+
+    def _cache_prefix(self):
+        """
+        Prefix of the cache keys of this model, per site and API key.
+        """
+        return 'pychargify:{0}:{1}:{2}:'.format(
+            self.sub_domain,
+            hashlib.sha1(self.api_key.encode('utf-8')).hexdigest()[:12],
+            self.__class__.__name__)
+
+    def _cache_key(self, url, params=None):
+        """
+        Cache key for a GET of ``url`` with ``params``.
+        """
+        if params:
+            url = '{0}?{1}'.format(url, urlencode(sorted(params.items())))
+        return self._cache_prefix() + url
+
+    def _invalidate_cache(self):
+        """
+        Drop every cached response of this model.
+        """
+        cache = getattr(self.transport, 'cache', None)
+        if cache is not None and cache.ttl_for(self):
+            cache.invalidate(self._cache_prefix())
+
+    def iter_all(self, per_page=200, start_page=1, prefetch=0,
+                 compact=False, lazy=False):
+        """
+        Lazily walk every page of the list endpoint.
+
+        Pages are requested with Chargify's ``page`` and ``per_page``
+        parameters and parsed models are yielded as each page arrives, so
+        memory is bounded by ``per_page`` rather than by the number of
+        records on the account. With ``prefetch`` set, that many pages are
+        requested ahead concurrently; results are still yielded in page
+        order. ``compact`` and ``lazy`` work as for :meth:`get`.
+        """
+        return self._iter_all(
+            self.setup_url(), per_page, start_page, prefetch, compact, lazy)
+
+    def _iter_all(self, url, per_page, start_page, prefetch=0,
+                  compact=False, lazy=False):
+        """
+        Yield parsed models from every page of ``url``.
+        """
+        if prefetch:
+            pages = self._prefetch_pages(
+                url, per_page, start_page, prefetch, compact, lazy)
+        else:
+            pages = (self.process_result(content, compact, lazy) for content
+                     in self._iter_pages(url, per_page, start_page))
+
+        for objs in pages:
+            for obj in objs:
+                yield obj
+
+    def _get_page(self, url, page, per_page):
+        """
+        Fetch the raw content of a single page of ``url``.
+        """
+        return self._get(url, params={'page': page, 'per_page': per_page})
+
+    def _page_ids(self, content):
+        """
+        Ids of the rows of a page, to tell one page from the next.
+        """
+        ids = []
+        for row in content:
+            if isinstance(row, dict):
+                row = row.get(self._meta.key, row)
+            ids.append(row.get('id') if isinstance(row, dict) else row)
+        return tuple(ids)
+
+    def _iter_pages(self, url, per_page, start_page):
+        """
+        Yield the raw content of each page of ``url`` until an empty page
+        is returned.
+
+        Some endpoints cap ``per_page`` below the requested size, so a
+        short page is not taken as the last one. Others, such as
+        ``products.json``, ignore ``page`` and return the same rows for
+        every page, so a page repeating the previous one ends the walk.
+        """
+        page = start_page
+        previous = None
+        while True:
+            content = self._get_page(url, page, per_page)
+            if not content:
+                return
+            ids = self._page_ids(content)
+            if ids == previous:
+                return
+            yield content
+            previous = ids
+            page += 1
+
+    def _fetch_page(self, url, page, per_page, compact=False, lazy=False):
+        """
+        Fetch and parse a single page of ``url``. Returns the ids of its
+        rows and the parsed objects, or ``None`` for an empty page.
+        """
+        content = self._get_page(url, page, per_page)
+        if not content:
+            return None
+        return (self._page_ids(content),
+                self.process_result(content, compact, lazy))
+
+    def _prefetch_pages(self, url, per_page, start_page, prefetch,
+                        compact=False, lazy=False):
+        """
+        Same as :meth:`_iter_pages`, keeping ``prefetch`` page requests in
+        flight on a thread pool, but yielding the parsed objects of each
+        page: pages are parsed on the thread that fetched them, so the
+        parse overlaps the other requests and instruments see each call
+        on a single thread.
+
+        Pages are yielded in order. Requests already sent for pages past
+        the first empty (or repeated) one are waited for and discarded, so
+        no request outlives the walk.
+        """
+        fetch = functools.partial(
+            self._fetch_page, url, per_page=per_page, compact=compact,
+            lazy=lazy)
+        previous = None
+
+        for _, future in bounded_map(
+                fetch, itertools.count(start_page), prefetch, prefetch):
+            page = future.result()
+            if page is None:
+                return
+            ids, objs = page
+            if ids == previous:
+                return
+            yield objs
+            previous = ids
 
     def save(self):
         """
         "Save" this object by performing an API call.
 
-        If the ``id`` attr is on the object, alter the URL.
+        If the ``id`` attr is on the object, alter the URL and send only
+        the changed fields; nothing is sent when none changed.
         """
         # pylint: disable=E1101
-        if hasattr(self, 'id') and isinstance(self.id, int):
-            url = self.setup_url(obj_id=self.id)
-        else:
-            url = self.setup_url()
+        if self.id and not self.changed_fields():
+            return self
 
-        obj = self._save(url, self._meta.key)
+        obj = self._save(self._save_url(), self._meta.key)
+        self._invalidate_cache()
         return self.parse(obj.get(self._meta.key), create_new_class=False)
 
-    def _get(self, url, **headers_kwargs):
+    def _save_url(self):
         """
-        Handle HTTP GET's to the API
+        URL to save this object to, including the ``id`` when it is set.
+        """
+        # pylint: disable=E1101
+        if hasattr(self, 'id') and isinstance(self.id, int):
+            return self.setup_url(obj_id=self.id)
+        return self.setup_url()
+
+    def _request(self, method, url, payload=None, params=None, stream=False,
+                 **headers_kwargs):
+        """
+        Send a request through the shared transport and check the
+        response code. With ``stream`` set the body is left unread.
+        """
+        response = self.transport.request(
+            method, stream=stream, **self._request_kwargs(
+                url, payload, params, **headers_kwargs))
+
+        try:
+            check_response_code(response.status_code)
+        except exceptions.ChargifyError:
+            response.close()
+            raise
+        return response
+
+    def _request_kwargs(self, url, payload=None, params=None,
+                        **headers_kwargs):
+        """
+        Build the keyword arguments for a transport request.
         """
         call_headers = headers()
         call_headers.update(headers_kwargs)
 
-        response = requests.get(
-            "{0}/{1}".format(self.request_host, url.lstrip('/')),
-            auth=(self.api_key, 'x'),
-            headers=call_headers)
+        return {
+            'url': "{0}/{1}".format(self.request_host, url.lstrip('/')),
+            'auth': (self.api_key, 'x'),
+            'headers': call_headers,
+            'params': params,
+            'data': (self.transport.codec.dumps(payload)
+                     if payload is not None else None)
+        }
 
-        check_response_code(response.status_code)
+    def _get(self, url, params=None, **headers_kwargs):
+        """
+        Handle HTTP GET's to the API
+        """
+        response = self._request('GET', url, params=params, **headers_kwargs)
 
         # hacky, make this better
         if response.url.endswith('.pdf'):
             return response
-        return response.json()
+        return self._decode(response)
+
+    def _get_stream(self, url, params=None, chunk_size=65536,
+                    **headers_kwargs):
+        """
+        Generator of the body of an HTTP GET, ``chunk_size`` bytes at a
+        time, without holding the whole response in memory.
+        """
+        response = self._request(
+            'GET', url, params=params, stream=True, **headers_kwargs)
+        try:
+            for chunk in response.iter_content(chunk_size):
+                if chunk:
+                    yield chunk
+        finally:
+            response.close()
 
     def _post(self, url, payload):
         """
         Handle HTTP POST's to the API
         """
-        response = requests.post(
-            "{0}/{1}".format(self.request_host, url.lstrip('/')),
-            auth=(self.api_key, 'x'),
-            headers=headers(),
-            data=json.dumps(payload)
-        )
-
-        check_response_code(response.status_code)
-        return response.json()
+        return self._decode(self._request('POST', url, payload))
 
     def _put(self, url, payload):
         """
         Handle HTTP PUT's to the API
         """
-        response = requests.put(
-            "{0}/{1}".format(self.request_host, url.lstrip('/')),
-            auth=(self.api_key, 'x'),
-            headers=headers(),
-            data=json.dumps(payload)
-        )
+        return self._decode(self._request('PUT', url, payload))
 
-        check_response_code(response.status_code)
-        return response.json()
+    def _decode(self, response):
+        """
+        Decode a JSON response body straight from its bytes with the
+        transport's codec.
+        """
+        instrument = self._instrument()
+        if not instrument.enabled:
+            return self.transport.codec.loads(response.content)
+
+        started = time.time()
+        content = self.transport.codec.loads(response.content)
+        instrument.decoded(self.__class__.__name__, time.time() - started,
+                           len(response.content))
+        return content
 
     # def _delete(self, url, data):
     #     """
@@ -302,15 +874,7 @@ class Model(six.with_metaclass(ModelBase)):
         """
         Save the object using the passed URL as the API end point
         """
-        obj_dict = {}
-
-        for item in self._meta.fields:
-            if item not in self._meta.read_only_fields:
-                obj_dict.update({
-                    item: self._meta.field_cache.get(item).to_string()
-                })
-
-        payload = {node_name: obj_dict}
+        payload = self._save_payload(node_name)
 
         # pylint: disable=E1101
         if self.id:
@@ -318,42 +882,179 @@ class Model(six.with_metaclass(ModelBase)):
 
         return self._post(url, payload)
 
+    def _save_payload(self, node_name):
+        """
+        Build the request body sent by :meth:`_save`: every writable field
+        for a new object, the changed ones for an update.
+        """
+        self._decode_pending()
+        obj_dict = {}
+
+        # pylint: disable=E1101
+        if self.id:
+            fields = self.changed_fields()
+        else:
+            fields = [item for item in self._meta.fields
+                      if item not in self._meta.read_only_fields]
+
+        for item in fields:
+            obj_dict.update({
+                item: self._fields.get(item).to_string()
+            })
+
+        return {node_name: obj_dict}
+
     def _set_val(self, name, value):
         """
-        Set the value on the class object as well as the Meta field cache
-        object.
+        Set the value on the instance's field and return its python
+        representation.
         """
-        cls_field = self._meta.field_cache.get(name)
+        cls_field = self._fields.get(name)
         cls_field.value = value
 
-        field = getattr(self, name)
-        field = cls_field.to_python()
-        return field
+        return cls_field.to_python()
+
+    @classmethod
+    def _model_class(cls, name):
+        """
+        Resolve a model named in ``Meta.attribute_types``, preferring the
+        module this model is defined in so the asyncio models nest their
+        own siblings.
+        """
+        from pychargify import api
+        module = sys.modules[cls.__module__]
+        return getattr(module, name, None) or getattr(api, name)
+
+    @classmethod
+    def _parse_plan(cls):
+        """
+        Map of each field name to a ``(nested model class, decode)`` pair,
+        the class being ``None`` for plain fields.
+
+        Built on first use, once the models named in
+        ``Meta.attribute_types`` can be resolved, and kept on ``_meta``.
+        """
+        plan = cls._meta.parse_plan
+        if plan is None:
+            attribute_types = getattr(cls._meta, 'attribute_types', {})
+            plan = collections.OrderedDict()
+            for name, field in cls._meta.field_map.items():
+                if name in attribute_types:
+                    plan[name] = (
+                        cls._model_class(attribute_types[name]), None)
+                else:
+                    plan[name] = (None, field.decode)
+            cls._meta.parse_plan = plan
+        return plan
+
+    def parse_record(self, content):
+        """
+        Parse the content of the API call into a compact :class:`Record`.
+        """
+        return self._parse_record(self.__class__, content)
+
+    def _parse_record(self, model, content):
+        """
+        Build a ``model`` record from ``content``, sharing this model's
+        credentials and transport.
+        """
+        record = model._meta.record_class(self)
+        field_map = model._meta.field_map
+
+        for name, (nested, decode) in model._parse_plan().items():
+            value = content.get(name, field_map[name].value)
+
+            if nested is not None:
+                if value is not None:
+                    value = self._parse_record(nested, value)
+            else:
+                value = decode(value)
 
-    def parse(self, content, create_new_class=True):
+            setattr(record, name, value)
+
+        return record
+
+    def parse(self, content, create_new_class=True, lazy=False):
         """
         Parse the content of the API call.
+
+        With ``lazy`` set, the raw values are kept and each field (dates
+        and nested ``attribute_types`` models included) is only decoded
+        the first time it is read.
         """
         if create_new_class:
-            klass = self.__class__(self.api_key, self.sub_domain)
+            klass = self.__class__(
+                self.api_key, self.sub_domain, self.transport)
         else:
             klass = self
-        self._meta.raw_content = content
-        for row in content:
-            if self._meta.field_cache.get(row):
-                if hasattr(self._meta, 'attribute_types'):
-                    if row in self._meta.attribute_types.keys():
-                        from pychargify import api
-                        field_class_name = self._meta.attribute_types.get(row)
-                        field_class = getattr(api, field_class_name)(
-                            self.api_key, self.sub_domain)
-
-                        field_class.parse(content.get(row))
-                        setattr(klass, row, field_class)
-                    else:
-                        setattr(klass,
-                                row, self._set_val(row, content.get(row)))
-                else:
-                    setattr(klass, row, self._set_val(row, content.get(row)))
-
+        klass.raw_content = content
+
+        if lazy:
+            pending = dict(
+                (row, value) for row, value in content.items()
+                if row in klass._fields)
+            for row in pending:
+                klass.__dict__.pop(row, None)
+            klass._pending = pending
+            klass._changed = set()
+            return klass
+
+        plan = klass._parse_plan()
+        fields = klass._fields
+        values = klass.__dict__
+        pending = values.get('_pending')
+
+        for row, value in content.items():
+            step = plan.get(row)
+            if step is None:
+                continue
+            if pending:
+                pending.pop(row, None)
+
+            nested, decode = step
+            if nested is None:
+                value = decode(value)
+            else:
+                value = klass._parse_nested(nested, value)
+            fields[row].value = values[row] = value
+
+        klass._changed = set()
         return klass
+
+    def _parse_field(self, name, value, lazy=False):
+        """
+        Python value of field ``name``: a nested model for the names in
+        ``Meta.attribute_types``, the decoded value otherwise.
+        """
+        nested, decode = self._parse_plan()[name]
+        if nested is not None:
+            return self._parse_nested(nested, value, lazy)
+        return decode(value)
+
+    def _parse_nested(self, model, content, lazy=False):
+        """
+        Build a nested ``model`` from ``content``, sharing this model's
+        credentials and transport.
+        """
+        if content is None:
+            return None
+
+        # lazily built models are decoded on first access, after the call
+        # that fetched them, so only eager builds are profiled
+        instrument = self._instrument()
+        if lazy or not instrument.profile:
+            obj = model(self.api_key, self.sub_domain, self.transport)
+            return obj.parse(content, create_new_class=False, lazy=lazy)
+
+        started = time.time()
+        obj = model(self.api_key, self.sub_domain, self.transport)
+        obj.parse(content, create_new_class=False, lazy=lazy)
+        instrument.nested_parsed(model.__name__, time.time() - started)
+        return obj
+
+    def _decode_pending(self):
+        """
+        Decode every field a lazy :meth:`parse` left pending.
+        """
+        for name in list(self.__dict__.get('_pending') or ()):
+            getattr(self, name)
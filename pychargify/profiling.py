@@ -0,0 +1,270 @@
+"""
+Profiling mode: where the time of each API call goes.
+
+``Chargify(..., profile=True)`` attaches a :class:`Profiler` that splits
+every call into phases:
+
+``connect``
+    opening the connection, TLS handshake included (reused keep-alive
+    connections cost nothing)
+``ttfb``
+    sending the request and waiting for the response headers
+``download``
+    reading the response body
+``decode``
+    decoding the JSON
+``build``
+    building the top-level models, field decoding included
+``nested``
+    building the nested models, e.g. a subscription's customer and product
+
+and aggregates them per method, endpoint and model class::
+
+    chargify = Chargify(api_key, sub_domain, profile=True)
+    list(chargify.subscription().iter_all())
+    print(chargify.profiler.format_report())
+
+Calls are followed per thread: retried attempts are added to the call
+they belong to, and prefetched pages are parsed on the thread that
+fetched them. Streamed statement downloads are read after the call,
+outside ``download``. Nested models of a ``lazy`` parse are built on
+first access, after their call, and are not counted; those of compact
+records count as ``build``. The asyncio client reports ``ttfb`` and
+``download`` together under ``ttfb`` and is only attributed correctly
+for calls made one at a time. ``connect`` needs a ``requests`` built on
+urllib3 1.8 or later.
+"""
+import time
+import threading
+import collections
+
+from pychargify.instrumentation import Instrument, endpoint
+
+
+PHASES = ('connect', 'ttfb', 'download', 'decode', 'build', 'nested')
+
+_CONNECT = threading.local()
+
+
+def _timed_connection(connection_cls):
+    """
+    Subclass of a urllib3 connection class adding the time spent in
+    ``connect()`` to this thread's total.
+    """
+    class TimedConnection(connection_cls):
+        def connect(self):
+            started = time.time()
+            try:
+                return super(TimedConnection, self).connect()
+            finally:
+                _CONNECT.seconds = (getattr(_CONNECT, 'seconds', 0.0) +
+                                    time.time() - started)
+
+    TimedConnection.__name__ = 'Timed{0}'.format(connection_cls.__name__)
+    return TimedConnection
+
+
+def install_connect_timer(adapter):
+    """
+    Make the connection pools of a ``requests`` ``HTTPAdapter`` time their
+    connects. Returns whether the installed urllib3 supports it.
+    """
+    manager = getattr(adapter, 'poolmanager', None)
+    pool_classes = getattr(manager, 'pool_classes_by_scheme', None)
+    if not pool_classes:
+        return False
+
+    timed = {}
+    for scheme, pool_cls in pool_classes.items():
+        if not hasattr(pool_cls, 'ConnectionCls'):
+            return False
+        timed[scheme] = type(str(pool_cls.__name__), (pool_cls, ), {
+            'ConnectionCls': _timed_connection(pool_cls.ConnectionCls)})
+
+    # an instance attribute, leaving urllib3's module level default alone
+    manager.pool_classes_by_scheme = timed
+    return True
+
+
+def reset_connect_time():
+    """
+    Start counting connect time for a request on this thread.
+    """
+    _CONNECT.seconds = 0.0
+
+
+def connect_time():
+    """
+    Seconds this thread spent connecting since :func:`reset_connect_time`.
+    """
+    return getattr(_CONNECT, 'seconds', 0.0)
+
+
+class CallProfile(object):
+    """
+    Phase breakdown of one API call.
+    """
+    def __init__(self, method=None, url=None):
+        self.method = method
+        self.endpoint = endpoint(url) if url else None
+        self.model = None
+        self.attempts = 0
+        self.status_code = None
+        self.phases = dict((phase, 0.0) for phase in PHASES)
+        self.connect_measured = True
+        self.retrying = False
+        self.parsed = False
+
+    def __repr__(self):
+        return '<CallProfile: {0} {1} {2}>'.format(
+            self.method, self.endpoint, self.model)
+
+    @property
+    def total(self):
+        return sum(self.phases.values())
+
+
+class Profiler(Instrument):
+    """
+    Instrument recording a :class:`CallProfile` per API call.
+
+    The last ``keep`` calls are kept in ``calls``; :meth:`report`
+    aggregates every call seen.
+    """
+    enabled = True
+    profile = True
+
+    def __init__(self, keep=1000):
+        self.lock = threading.Lock()
+        self.calls = collections.deque(maxlen=keep)
+        self.current = {}
+        self.nested = {}
+        self.totals = {}
+
+    def _thread(self):
+        return threading.current_thread().ident
+
+    def _flush(self, call):
+        with self.lock:
+            self.calls.append(call)
+            key = (call.method, call.endpoint, call.model)
+            totals = self.totals.get(key)
+            if totals is None:
+                totals = self.totals[key] = {
+                    'calls': 0, 'attempts': 0, 'phases': dict(
+                        (phase, 0.0) for phase in PHASES)}
+            totals['calls'] += 1
+            totals['attempts'] += call.attempts
+            for phase, seconds in call.phases.items():
+                totals['phases'][phase] += seconds
+
+    def _call(self):
+        """
+        Call in progress on this thread, started if there is none (e.g. a
+        parse of cached content).
+        """
+        call = self.current.get(self._thread())
+        if call is None:
+            call = self.current[self._thread()] = CallProfile()
+        return call
+
+    def before_request(self, method, url):
+        thread = self._thread()
+        call = self.current.get(thread)
+        if call is None or not call.retrying:
+            if call is not None:
+                self._flush(call)
+            call = self.current[thread] = CallProfile(method, url)
+        call.retrying = False
+        call.attempts += 1
+
+    def after_request(self, method, url, status_code, seconds,
+                      sent_bytes=0, received_bytes=0, error=None):
+        call = self._call()
+        call.status_code = status_code
+        if status_code is None:
+            # no response: the whole attempt went to getting one
+            call.phases['ttfb'] += seconds
+
+    def retry(self, method, url, attempt, delay):
+        self._call().retrying = True
+
+    def request_phases(self, method, url, connect, ttfb, download):
+        call = self._call()
+        if connect is None:
+            call.connect_measured = False
+        else:
+            call.phases['connect'] += connect
+        call.phases['ttfb'] += ttfb
+        call.phases['download'] += download
+
+    def decoded(self, model, seconds, size):
+        call = self._call()
+        call.model = call.model or model
+        call.phases['decode'] += seconds
+
+    def nested_parsed(self, model, seconds):
+        thread = self._thread()
+        self.nested[thread] = self.nested.get(thread, 0.0) + seconds
+
+    def parsed(self, model, seconds, rows):
+        thread = self._thread()
+        nested = self.nested.pop(thread, 0.0)
+        call = self.current.pop(thread, None) or CallProfile()
+        call.model = model
+        call.phases['nested'] += nested
+        call.phases['build'] += max(seconds - nested, 0.0)
+        call.parsed = True
+        self._flush(call)
+
+    def finish(self):
+        """
+        Record the calls still open, e.g. saves and streamed downloads,
+        which have no parse step to end them.
+        """
+        for thread in list(self.current):
+            call = self.current.pop(thread, None)
+            if call is not None:
+                self._flush(call)
+
+    def report(self):
+        """
+        One dict per method, endpoint and model class with the number of
+        calls and attempts and the total and mean seconds of each phase,
+        the most expensive first.
+        """
+        self.finish()
+        rows = []
+        with self.lock:
+            for (method, path, model), totals in self.totals.items():
+                calls = totals['calls']
+                phases = dict(totals['phases'])
+                rows.append({
+                    'method': method,
+                    'endpoint': path,
+                    'model': model,
+                    'calls': calls,
+                    'attempts': totals['attempts'],
+                    'phases': phases,
+                    'mean': dict((phase, seconds / calls)
+                                 for phase, seconds in phases.items()),
+                    'total': sum(phases.values()),
+                })
+        return sorted(rows, key=lambda row: row['total'], reverse=True)
+
+    def format_report(self):
+        """
+        :meth:`report` as a text table of mean milliseconds per call.
+        """
+        lines = ['{0:<6} {1:<36} {2:<13} {3:>6} {4} {5:>9}'.format(
+            'method', 'endpoint', 'model', 'calls',
+            ' '.join('{0:>9}'.format(phase) for phase in PHASES),
+            'total ms')]
+        for row in self.report():
+            lines.append('{0:<6} {1:<36} {2:<13} {3:>6} {4} {5:>9.2f}'.format(
+                row['method'] or '-', row['endpoint'] or '-',
+                row['model'] or '-', row['calls'],
+                ' '.join('{0:>9.2f}'.format(row['mean'][phase] * 1000)
+                         for phase in PHASES),
+                row['total'] / row['calls'] * 1000))
+        return '\n'.join(lines)
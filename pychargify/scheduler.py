@@ -0,0 +1,238 @@
+"""
+Request scheduling for the HTTP transports: per-subdomain rate limiting,
+retries with jittered exponential backoff and a bounded retry budget.
+"""
+import time
+import random
+import threading
+import email.utils
+
+from six.moves.urllib.parse import urlparse
+
+
+# Requests that are safe to resend after a 5xx or a dropped connection.
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS'])
+
+
+class TokenBucket(object):
+    """
+    Token bucket allowing ``rate`` requests per second with bursts of up
+    to ``capacity`` requests (at least one).
+    """
+    def __init__(self, rate, capacity=None, clock=time.time):
+        self.rate = float(rate)
+        # at least one token, or a rate below 1/s throttles every request
+        self.capacity = max(1.0, float(capacity or rate))
+        self.clock = clock
+        self.tokens = self.capacity
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Take a token and return how many seconds the caller must wait
+        before using it.
+        """
+        with self.lock:
+            now = self.clock()
+            self.tokens = min(
+                self.capacity,
+                self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+class RetryBudget(object):
+    """
+    Caps retries to a fraction of the traffic.
+
+    Every request deposits ``ratio`` tokens on its first attempt and every
+    retry withdraws one, starting from a reserve of ``min_retries`` so
+    quiet clients can still retry, and never saving up more than
+    ``max_retries``. Once the budget is spent, failures are returned to the
+    caller instead of being retried.
+    """
+    def __init__(self, ratio=0.2, min_retries=10, max_retries=100):
+        self.ratio = ratio
+        self.max_retries = max_retries
+        self.balance = float(min_retries)
+        self.lock = threading.Lock()
+
+    def deposit(self):
+        """
+        Record a request.
+        """
+        with self.lock:
+            self.balance = min(self.balance + self.ratio, self.max_retries)
+
+    def withdraw(self):
+        """
+        Try to spend one retry. Returns ``False`` if the budget is empty.
+        """
+        with self.lock:
+            if self.balance < 1:
+                return False
+            self.balance -= 1
+            return True
+
+
+class SchedulerStats(object):
+    """
+    Counters describing how much the scheduler throttled and retried.
+    """
+    fields = (
+        'requests', 'retries', 'rate_limited', 'server_errors',
+        'connection_errors', 'budget_exhausted', 'throttled_seconds',
+        'backoff_seconds',
+    )
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        for field in self.fields:
+            setattr(self, field, 0)
+
+    def incr(self, field, amount=1):
+        """
+        Increment a counter.
+        """
+        with self.lock:
+            setattr(self, field, getattr(self, field) + amount)
+
+    def snapshot(self):
+        """
+        Return the counters as a dict.
+        """
+        with self.lock:
+            return dict((field, getattr(self, field)) for field in self.fields)
+
+
+def parse_retry_after(value):
+    """
+    Turn a ``Retry-After`` header, in seconds or as an HTTP date, into a
+    number of seconds. Returns ``None`` if it can't be parsed.
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    parsed = email.utils.parsedate_tz(value)
+    if parsed is None:
+        return None
+    return max(0.0, email.utils.mktime_tz(parsed) - time.time())
+
+
+class RequestScheduler(object):
+    """
+    Decides when requests may be sent and whether failures are retried.
+
+    ``rate`` (requests per second) and ``burst`` configure a token bucket
+    per subdomain; ``None`` disables rate limiting. Responses with a status
+    in ``retry_statuses`` and dropped connections are retried up to
+    ``max_retries`` times, honouring ``Retry-After`` and otherwise backing
+    off exponentially with full jitter, while the ``budget`` allows it.
+    ``Retry-After`` waits are capped at ``retry_after_max`` seconds, by
+    default ``backoff_max``.
+    Non idempotent requests are only retried on 429, which Chargify sends
+    before doing any work.
+    """
+    retry_statuses = frozenset([429, 502, 503, 504])
+
+    def __init__(self, rate=None, burst=None, max_retries=3,
+                 backoff_base=0.5, backoff_max=30.0, budget=None,
+                 sleep=time.sleep, retry_after_max=None):
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_after_max = (backoff_max if retry_after_max is None
+                                else retry_after_max)
+        self.budget = budget or RetryBudget()
+        self.sleep = sleep
+        self.stats = SchedulerStats()
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def _bucket(self, url):
+        host = urlparse(url).netloc
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = self.buckets[host] = TokenBucket(
+                    self.rate, self.burst)
+            return bucket
+
+    def acquire(self, url, attempt=0):
+        """
+        Record a request to ``url`` and return how long to wait before
+        sending it. Retries (``attempt`` above 0) don't refill the retry
+        budget.
+        """
+        self.stats.incr('requests')
+        if not attempt:
+            self.budget.deposit()
+
+        if not self.rate:
+            return 0.0
+
+        delay = self._bucket(url).reserve()
+        if delay:
+            self.stats.incr('throttled_seconds', delay)
+        return delay
+
+    def backoff(self, attempt):
+        """
+        Full jitter exponential backoff for the given retry attempt.
+        """
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, ceiling)
+
+    def retry_delay(self, method, attempt, status_code=None, headers=None,
+                    error=None):
+        """
+        Return the number of seconds to wait before retrying, or ``None``
+        if the response (or connection ``error``) should be returned to
+        the caller as is.
+        """
+        if error is None and status_code not in self.retry_statuses:
+            return None
+
+        if error is not None:
+            self.stats.incr('connection_errors')
+        elif status_code == 429:
+            self.stats.incr('rate_limited')
+        else:
+            self.stats.incr('server_errors')
+
+        if status_code != 429 and method.upper() not in IDEMPOTENT_METHODS:
+            return None
+
+        if attempt >= self.max_retries:
+            return None
+
+        if not self.budget.withdraw():
+            self.stats.incr('budget_exhausted')
+            return None
+
+        delay = None
+        if headers is not None:
+            delay = parse_retry_after(headers.get('Retry-After'))
+            if delay is not None:
+                delay = min(delay, self.retry_after_max)
+
+        if delay is None:
+            delay = self.backoff(attempt)
+            self.stats.incr('backoff_seconds', delay)
+        else:
+            self.stats.incr('throttled_seconds', delay)
+
+        self.stats.incr('retries')
+        return delay
@@ -0,0 +1,111 @@
+"""
+Pluggable JSON codecs used to encode request bodies and decode responses.
+
+The stdlib ``json`` module is used by default. ``orjson`` and ``ujson``
+backends decode straight from the response bytes and are picked up by
+``get_codec('auto')`` when installed.
+"""
+import json
+
+import six
+
+from pychargify import exceptions
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover
+    ujson = None
+
+
+class JSONCodec(object):
+    """
+    Codec backed by the stdlib ``json`` module.
+    """
+    name = 'json'
+
+    def loads(self, data):
+        """
+        Decode a response body, given as bytes or text.
+        """
+        if isinstance(data, six.binary_type) and not six.PY2:
+            # json.loads only accepts bytes from Python 3.6 on
+            data = data.decode('utf-8')
+        return json.loads(data)
+
+    def dumps(self, obj):
+        """
+        Encode a request body.
+        """
+        return json.dumps(obj)
+
+
+class OrjsonCodec(JSONCodec):
+    """
+    Codec backed by ``orjson``.
+    """
+    name = 'orjson'
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+    def dumps(self, obj):
+        return orjson.dumps(obj)
+
+
+class UjsonCodec(JSONCodec):
+    """
+    Codec backed by ``ujson``.
+    """
+    name = 'ujson'
+
+    def loads(self, data):
+        return ujson.loads(data)
+
+    def dumps(self, obj):
+        return ujson.dumps(obj)
+
+
+CODECS = (
+    (OrjsonCodec, orjson),
+    (UjsonCodec, ujson),
+    (JSONCodec, json),
+)
+
+
+def available_codecs():
+    """
+    Names of the codecs whose backend is installed, fastest first.
+    """
+    return [codec.name for codec, module in CODECS if module is not None]
+
+
+def get_codec(codec=None):
+    """
+    Return a codec instance.
+
+    ``codec`` may be a codec instance, the name of a backend (``'json'``,
+    ``'orjson'`` or ``'ujson'``), ``'auto'`` for the fastest installed one,
+    or ``None`` for the stdlib.
+    """
+    if codec is None:
+        return JSONCodec()
+
+    if not isinstance(codec, six.string_types):
+        return codec
+
+    if codec == 'auto':
+        codec = available_codecs()[0]
+
+    for codec_class, module in CODECS:
+        if codec_class.name == codec:
+            if module is None:
+                raise exceptions.ChargifyError(
+                    'The {0} JSON codec is not installed'.format(codec))
+            return codec_class()
+
+    raise exceptions.ChargifyError('Unknown JSON codec {0}'.format(codec))
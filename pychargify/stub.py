@@ -0,0 +1,532 @@
+"""
+Offline stand-in for the Chargify API.
+
+Serves generated customers, products, subscriptions and statements over
+plain HTTP so the client can be load tested and benchmarked without a
+network::
+
+    with StubServer(StubData(customers=10000), latency=0.005) as server:
+        chargify = Chargify('key', 'stub', base_url=server.url)
+        customers = list(chargify.customer().iter_all())
+
+or from a shell::
+
+    python -m pychargify.stub --customers 10000 --port 8000
+
+Only the endpoints the client uses are implemented. Lists are paginated
+with ``page``/``per_page``; ``latency`` delays every response and
+``error_rate``/``rate_limit_rate`` answer that fraction of requests with a
+503 or a 429. :meth:`StubServer.fail_next` queues faults deterministically.
+"""
+from __future__ import print_function
+
+import re
+import sys
+import json
+import time
+import bisect
+import random
+import datetime
+import argparse
+import threading
+import collections
+
+from six.moves import BaseHTTPServer, socketserver
+from six.moves.urllib.parse import urlparse, parse_qs
+
+from pychargify.models import parse_datetime
+
+
+EPOCH = datetime.datetime(2013, 1, 1)
+
+
+def _timestamp(minutes):
+    return (EPOCH + datetime.timedelta(minutes=minutes)).strftime(
+        '%Y-%m-%dT%H:%M:%S-04:00')
+
+
+class StubData(object):
+    """
+    Generated account: ``customers`` customers with
+    ``subscriptions_per_customer`` subscriptions each, spread over
+    ``products`` products, and ``statements_per_subscription`` statements
+    per subscription.
+
+    Lookups and the ``updated_at`` order of the list endpoints are indexed
+    once, so serving a page costs the same whatever the account size.
+    """
+    def __init__(self, customers=100, products=5, subscriptions_per_customer=1,
+                 statements_per_subscription=2, pdf_size=20000):
+        self.lock = threading.Lock()
+        self.pdf_size = pdf_size
+        self.products = collections.OrderedDict()
+        self.customers = collections.OrderedDict()
+        self.subscriptions = collections.OrderedDict()
+        self.statements = collections.OrderedDict()
+
+        for number in range(1, products + 1):
+            self.products[number] = {
+                'id': number,
+                'name': 'Product {0}'.format(number),
+                'handle': 'product-{0}'.format(number),
+                'description': '',
+                'accounting_code': '',
+                'interval_unit': 'month',
+                'interval': 1,
+                'price_in_cents': 1000 * number,
+                'initial_charge_in_cents': None,
+                'trial_price_in_cents': 0,
+                'trial_interval': None,
+                'trial_interval_unit': 'month',
+                'expiration_interval': None,
+                'expiration_interval_unit': 'never',
+                'return_url': '',
+                'return_params': '',
+                'require_credit_card': True,
+                'request_credit_card': True,
+                'created_at': _timestamp(0),
+                'updated_at': _timestamp(0),
+                'archived_at': None,
+                'product_family': {'id': 1, 'name': 'Family'},
+            }
+
+        for number in range(1, customers + 1):
+            self.customers[number] = {
+                'id': number,
+                'first_name': 'Customer',
+                'last_name': str(number),
+                'email': 'customer{0}@example.com'.format(number),
+                'organization': '',
+                'reference': 'customer-{0}'.format(number),
+                'address': '{0} Main Street'.format(number),
+                'address_2': '',
+                'city': 'Columbia',
+                'state': 'MO',
+                'zip': '65202',
+                'country': 'US',
+                'phone': '555-555-1212',
+                'created_at': _timestamp(number),
+                'updated_at': _timestamp(number),
+            }
+
+        subscription_id = statement_id = 0
+        for customer_id in self.customers:
+            for _ in range(subscriptions_per_customer):
+                subscription_id += 1
+                self.subscriptions[subscription_id] = {
+                    'id': subscription_id,
+                    'state': 'active',
+                    'balance_in_cents': 0,
+                    'total_revenue_in_cents': 1000,
+                    'cancel_at_end_of_period': False,
+                    'canceled_at': None,
+                    'cancellation_message': None,
+                    'coupon_code': None,
+                    'signup_payment_id': subscription_id,
+                    'signup_revenue': '10.00',
+                    'customer_id': customer_id,
+                    'product_id': subscription_id % products + 1,
+                    'activated_at': _timestamp(customer_id),
+                    'created_at': _timestamp(customer_id),
+                    'updated_at': _timestamp(customer_id),
+                    'current_period_started_at': _timestamp(customer_id),
+                    'current_period_ends_at': _timestamp(customer_id + 43200),
+                    'next_assessment_at': _timestamp(customer_id + 43200),
+                    'expires_at': None,
+                    'trial_started_at': None,
+                    'trial_ended_at': None,
+                    'delayed_cancel_at': None,
+                    'previous_state': 'active',
+                }
+                for _ in range(statements_per_subscription):
+                    statement_id += 1
+                    self.statements[statement_id] = {
+                        'id': statement_id,
+                        'subscription_id': subscription_id,
+                        'opened_at': _timestamp(customer_id),
+                        'closed_at': _timestamp(customer_id + 43200),
+                        'settled_at': _timestamp(customer_id + 43200),
+                        'starting_balance_in_cents': 0,
+                        'ending_balance_in_cents': 0,
+                        'total_in_cents': 1000,
+                        'created_at': _timestamp(customer_id),
+                        'updated_at': _timestamp(customer_id),
+                    }
+
+        self.customer_references = dict(
+            (row['reference'], row['id']) for row in self.customers.values())
+        self.subscriptions_by_customer = collections.defaultdict(list)
+        for row in self.subscriptions.values():
+            self.subscriptions_by_customer[row['customer_id']].append(
+                row['id'])
+        self.statements_by_subscription = collections.defaultdict(list)
+        for row in self.statements.values():
+            self.statements_by_subscription[row['subscription_id']].append(
+                row['id'])
+        self.statement_order = list(self.statements)
+        # (updated_at, id) of each row, ascending
+        self.updated = {
+            'customers': sorted(_order_key(row)
+                                for row in self.customers.values()),
+            'subscriptions': sorted(_order_key(row)
+                                    for row in self.subscriptions.values()),
+        }
+
+    def page_by_update(self, kind, query, default_per_page=20):
+        """
+        Ids of the ``kind`` rows (``'customers'`` or ``'subscriptions'``)
+        on the page ``query`` asks for, applying the ``start_datetime`` and
+        ``direction`` filters of the list endpoints on ``updated_at``.
+        """
+        offset, per_page = _page_range(query, default_per_page)
+        start = query.get('start_datetime')
+        with self.lock:
+            keys = self.updated[kind]
+            first = bisect.bisect_left(keys, (parse_datetime(start), )) \
+                if start else 0
+            if query.get('direction') == 'desc':
+                stop = max(len(keys) - offset, first)
+                keys = keys[max(stop - per_page, first):stop][::-1]
+            else:
+                keys = keys[first + offset:first + offset + per_page]
+        return [row_id for _, row_id in keys]
+
+    def subscription(self, subscription_id):
+        """
+        A subscription as the API returns it, customer and product nested.
+        """
+        row = dict(self.subscriptions[subscription_id])
+        row['customer'] = self.customers[row.pop('customer_id')]
+        row['product'] = self.products[row.pop('product_id')]
+        return row
+
+    def pdf(self, statement_id):
+        """
+        Placeholder PDF bytes of ``pdf_size`` for a statement.
+        """
+        head = '%PDF-1.4\n% statement {0}\n'.format(statement_id).encode()
+        return head + b'0' * max(self.pdf_size - len(head), 0)
+
+    def save_customer(self, fields, customer_id=None):
+        """
+        Create or update a customer from the fields of a POST/PUT body.
+        """
+        with self.lock:
+            order = self.updated['customers']
+            if customer_id is None:
+                customer_id = max(self.customers or [0]) + 1
+                row = self.customers[customer_id] = {
+                    'id': customer_id, 'created_at': _timestamp(0)}
+            else:
+                row = self.customers[customer_id]
+                del order[bisect.bisect_left(order, _order_key(row))]
+                if self.customer_references.get(
+                        row.get('reference')) == customer_id:
+                    del self.customer_references[row['reference']]
+            fields = dict(fields)
+            for name in ('id', 'created_at', 'updated_at'):
+                fields.pop(name, None)
+            row.update(fields)
+            row['updated_at'] = datetime.datetime.utcnow().strftime(
+                '%Y-%m-%dT%H:%M:%S+00:00')
+            bisect.insort(order, _order_key(row))
+            if row.get('reference'):
+                self.customer_references[row['reference']] = customer_id
+            return row
+
+
+def _order_key(row):
+    return (parse_datetime(row['updated_at']), row['id'])
+
+
+def _page_range(query, default_per_page=20, max_per_page=200):
+    """
+    Offset and size of the page ``query`` asks for.
+    """
+    page = max(int(query.get('page', 1)), 1)
+    per_page = min(int(query.get('per_page', default_per_page)),
+                   max_per_page)
+    return (page - 1) * per_page, per_page
+
+
+def _page(rows, query, default_per_page=20, max_per_page=200):
+    offset, per_page = _page_range(query, default_per_page, max_per_page)
+    return rows[offset:offset + per_page]
+
+
+class StubHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """
+    Routes requests to the :class:`StubData` of the server.
+    """
+    protocol_version = 'HTTP/1.1'
+    # headers and body are written separately; don't let Nagle hold the
+    # body back for a delayed ACK
+    disable_nagle_algorithm = True
+
+    routes = [
+        ('GET', r'/customers\.json', 'list_customers'),
+        ('POST', r'/customers\.json', 'create_customer'),
+        ('GET', r'/customers/lookup\.json', 'lookup_customer'),
+        ('GET', r'/customers/(\d+)\.json', 'get_customer'),
+        ('PUT', r'/customers/(\d+)\.json', 'update_customer'),
+        ('GET', r'/customers/(\d+)/subscriptions\.json',
+         'customer_subscriptions'),
+        ('GET', r'/products\.json', 'list_products'),
+        ('GET', r'/products/(\d+)\.json', 'get_product'),
+        ('GET', r'/subscriptions\.json', 'list_subscriptions'),
+        ('GET', r'/subscriptions/(\d+)\.json', 'get_subscription'),
+        ('GET', r'/subscriptions/(\d+)/statements\.json',
+         'subscription_statements'),
+        ('GET', r'/subscriptions/(\d+)/statements/ids\.json',
+         'subscription_statement_ids'),
+        ('GET', r'/statements/ids\.json', 'statement_ids'),
+        ('GET', r'/statements/(\d+)\.json', 'get_statement'),
+        ('GET', r'/statements/(\d+)\.pdf', 'get_statement_pdf'),
+    ]
+
+    def do_GET(self):
+        self.dispatch('GET')
+
+    def do_POST(self):
+        self.dispatch('POST')
+
+    def do_PUT(self):
+        self.dispatch('PUT')
+
+    def log_message(self, *args):
+        if self.server.verbose:
+            BaseHTTPServer.BaseHTTPRequestHandler.log_message(self, *args)
+
+    def dispatch(self, method):
+        url = urlparse(self.path)
+        self.query = dict(
+            (key, values[-1]) for key, values in parse_qs(url.query).items())
+        self.data = self.server.data
+        length = int(self.headers.get('Content-Length') or 0)
+        self.body = self.rfile.read(length) if length else b''
+
+        fault = self.server.next_fault()
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if fault:
+            return self.send(fault, {'errors': ['Injected fault']},
+                             {'Retry-After': '0'} if fault == 429 else None)
+
+        for route_method, pattern, name in self.routes:
+            match = re.match(pattern + '$', url.path)
+            if match and route_method == method:
+                args = [int(arg) for arg in match.groups()]
+                try:
+                    return getattr(self, name)(*args)
+                except KeyError:
+                    return self.send(404, {'errors': ['Not Found']})
+        return self.send(404, {'errors': ['Not Found']})
+
+    def send(self, status, content, headers=None, content_type=None):
+        if isinstance(content, bytes):
+            body = content
+        else:
+            body = json.dumps(content).encode('utf-8')
+        self.send_response(status)
+        self.send_header(
+            'Content-Type', content_type or 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def list_customers(self):
+        ids = self.data.page_by_update('customers', self.query, 50)
+        self.send(200, [{'customer': self.data.customers[customer_id]}
+                        for customer_id in ids])
+
+    def lookup_customer(self):
+        customer_id = self.data.customer_references[
+            self.query.get('reference')]
+        self.send(200, {'customer': self.data.customers[customer_id]})
+
+    def get_customer(self, customer_id):
+        self.send(200, {'customer': self.data.customers[customer_id]})
+
+    def create_customer(self):
+        fields = json.loads(self.body.decode('utf-8'))['customer']
+        if not fields.get('email'):
+            return self.send(
+                422, {'errors': ['Email address: cannot be blank.']})
+        self.send(201, {'customer': self.data.save_customer(fields)})
+
+    def update_customer(self, customer_id):
+        fields = json.loads(self.body.decode('utf-8'))['customer']
+        if customer_id not in self.data.customers:
+            raise KeyError(customer_id)
+        self.send(200, {'customer': self.data.save_customer(
+            fields, customer_id)})
+
+    def customer_subscriptions(self, customer_id):
+        if customer_id not in self.data.customers:
+            raise KeyError(customer_id)
+        self.send(200, [
+            {'subscription': self.data.subscription(subscription_id)}
+            for subscription_id
+            in self.data.subscriptions_by_customer[customer_id]])
+
+    def list_products(self):
+        self.send(200, [{'product': row}
+                        for row in self.data.products.values()])
+
+    def get_product(self, product_id):
+        self.send(200, {'product': self.data.products[product_id]})
+
+    def list_subscriptions(self):
+        ids = self.data.page_by_update('subscriptions', self.query)
+        self.send(200, [{'subscription': self.data.subscription(
+            subscription_id)} for subscription_id in ids])
+
+    def get_subscription(self, subscription_id):
+        self.send(200, {
+            'subscription': self.data.subscription(subscription_id)})
+
+    def _statements_of(self, subscription_id):
+        if subscription_id not in self.data.subscriptions:
+            raise KeyError(subscription_id)
+        return [self.data.statements[statement_id] for statement_id
+                in self.data.statements_by_subscription[subscription_id]]
+
+    def subscription_statements(self, subscription_id):
+        rows = _page(self._statements_of(subscription_id), self.query)
+        self.send(200, [{'statement': row} for row in rows])
+
+    def subscription_statement_ids(self, subscription_id):
+        self.send(200, {'statement_ids': [
+            row['id'] for row in self._statements_of(subscription_id)]})
+
+    def statement_ids(self):
+        ids = _page(self.data.statement_order, self.query, 10000, 10000)
+        self.send(200, {'statement_ids': ids})
+
+    def get_statement(self, statement_id):
+        self.send(200, {'statement': self.data.statements[statement_id]})
+
+    def get_statement_pdf(self, statement_id):
+        if statement_id not in self.data.statements:
+            raise KeyError(statement_id)
+        self.send(200, self.data.pdf(statement_id),
+                  content_type='application/pdf')
+
+
+class StubServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    """
+    Threaded HTTP server answering like the Chargify API on ``url``.
+
+    ``port=0`` picks a free port. Use it as a context manager, or call
+    :meth:`start` and :meth:`stop`.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, data=None, host='127.0.0.1', port=0, latency=0.0,
+                 error_rate=0.0, rate_limit_rate=0.0, seed=None,
+                 verbose=False):
+        BaseHTTPServer.HTTPServer.__init__(self, (host, port), StubHandler)
+        self.data = data if data is not None else StubData()
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.verbose = verbose
+        self.random = random.Random(seed)
+        self.faults = collections.deque()
+        self.fault_lock = threading.Lock()
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return 'http://{0}:{1}'.format(host, port)
+
+    def fail_next(self, status, count=1):
+        """
+        Answer the next ``count`` requests with ``status``.
+        """
+        with self.fault_lock:
+            self.faults.extend([status] * count)
+
+    def next_fault(self):
+        """
+        Status of the fault to inject for a request, if any.
+        """
+        with self.fault_lock:
+            if self.faults:
+                return self.faults.popleft()
+            draw = self.random.random()
+        if draw < self.rate_limit_rate:
+            return 429
+        if draw < self.rate_limit_rate + self.error_rate:
+            return 503
+        return None
+
+    def start(self):
+        """
+        Serve on a background thread.
+        """
+        self.thread = threading.Thread(
+            target=self.serve_forever, kwargs={'poll_interval': 0.05})
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop serving and close the socket.
+        """
+        self.shutdown()
+        self.server_close()
+        if self.thread is not None:
+            self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Offline stand-in for the Chargify API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--customers', type=int, default=100)
+    parser.add_argument('--products', type=int, default=5)
+    parser.add_argument('--subscriptions-per-customer', type=int, default=1)
+    parser.add_argument('--statements-per-subscription', type=int, default=2)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='seconds added to every response')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='fraction of requests answered with a 503')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0,
+                        help='fraction of requests answered with a 429')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args(argv)
+
+    data = StubData(
+        customers=args.customers, products=args.products,
+        subscriptions_per_customer=args.subscriptions_per_customer,
+        statements_per_subscription=args.statements_per_subscription)
+    server = StubServer(
+        data, args.host, args.port, latency=args.latency,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate,
+        verbose=args.verbose)
+
+    print('Serving the Chargify stand-in on {0}'.format(server.url),
+          file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
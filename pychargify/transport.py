@@ -0,0 +1,156 @@
+"""
+Pooled HTTP transport shared by the models of a Chargify client
+"""
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from pychargify import profiling
+from pychargify.coalesce import SingleFlight
+from pychargify.instrumentation import NULL_INSTRUMENT
+from pychargify.scheduler import RequestScheduler
+from pychargify.serializers import get_codec
+
+
+class Transport(object):
+    """
+    Wraps a single ``requests.Session`` so every model handed out by a
+    :class:`pychargify.api.Chargify` client reuses the same keep-alive
+    connection pool instead of opening a new connection per API call.
+    """
+    def __init__(self, pool_size=10, keep_alive=True, timeout=None,
+                 scheduler=None, codec=None, cache=None, coalesce=False,
+                 base_url=None, instrument=None):
+        """
+        ``pool_size`` is the number of connections kept open per host,
+        ``timeout`` is passed to every request (a float or a
+        ``(connect, read)`` tuple) and ``keep_alive=False`` asks the server
+        to close each connection after the response. ``scheduler`` is the
+        :class:`pychargify.scheduler.RequestScheduler` rate limiting and
+        retrying requests, ``codec`` the JSON codec (or codec name, see
+        :func:`pychargify.serializers.get_codec`) used by the models and
+        ``cache`` the :class:`pychargify.cache.BaseCache` their GETs read
+        through. With ``coalesce`` set, identical concurrent GETs share one
+        request and its parsed result. ``base_url`` replaces
+        ``https://<sub_domain>.chargify.com``, e.g. to talk to
+        :mod:`pychargify.stub`. ``instrument`` is the
+        :class:`pychargify.instrumentation.Instrument` told about every
+        request.
+        """
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+        self.scheduler = scheduler or RequestScheduler()
+        self.codec = get_codec(codec)
+        self.cache = cache
+        self.coalescer = SingleFlight() if coalesce else None
+        self.base_url = base_url
+        self.instrument = instrument or NULL_INSTRUMENT
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        if not keep_alive:
+            self.session.headers['Connection'] = 'close'
+
+        self.times_connects = (
+            self.instrument.profile and
+            profiling.install_connect_timer(adapter))
+
+    def request(self, method, url, **kwargs):
+        """
+        Perform an HTTP request on the pooled session.
+
+        Accepts the same keyword arguments as ``requests.Session.request``.
+        ``timeout`` defaults to the one configured on the transport.
+        Requests wait for the scheduler's rate limiter, and throttled or
+        transient failures are retried as it decides.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        scheduler = self.scheduler
+        instrument = self.instrument
+        attempt = 0
+
+        while True:
+            delay = scheduler.acquire(url, attempt)
+            if delay:
+                scheduler.sleep(delay)
+
+            if instrument.enabled:
+                instrument.before_request(method, url)
+                if instrument.profile:
+                    profiling.reset_connect_time()
+                started = time.time()
+
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as error:
+                if instrument.enabled:
+                    instrument.after_request(
+                        method, url, None, time.time() - started,
+                        len(kwargs.get('data') or b''), error=error)
+                delay = scheduler.retry_delay(method, attempt, error=error)
+                if delay is None:
+                    raise
+            else:
+                if instrument.enabled:
+                    self._instrument_response(
+                        method, url, response, time.time() - started, kwargs)
+                delay = scheduler.retry_delay(
+                    method, attempt, response.status_code, response.headers)
+                if delay is None:
+                    return response
+                # release the connection of a streamed response we drop
+                response.close()
+
+            if instrument.enabled:
+                instrument.retry(method, url, attempt, delay)
+            scheduler.sleep(delay)
+            attempt += 1
+
+    def _instrument_response(self, method, url, response, seconds, kwargs):
+        """
+        Report a response to the instrument, without reading the body of
+        a streamed one.
+        """
+        if kwargs.get('stream'):
+            received = int(response.headers.get('Content-Length') or 0)
+        else:
+            received = len(response.content)
+        self.instrument.after_request(
+            method, url, response.status_code, seconds,
+            len(kwargs.get('data') or b''), received)
+
+        if self.instrument.profile:
+            # ``elapsed`` runs until the headers are parsed, the body is
+            # read after it unless streamed
+            elapsed = response.elapsed.total_seconds()
+            connect = None
+            if self.times_connects:
+                connect = min(profiling.connect_time(), elapsed)
+            self.instrument.request_phases(
+                method, url, connect, elapsed - (connect or 0.0),
+                max(seconds - elapsed, 0.0))
+
+    def close(self):
+        """
+        Close every pooled connection.
+        """
+        self.session.close()
+
+
+_DEFAULT_TRANSPORT = []
+
+
+def default_transport():
+    """
+    Transport used by models created without one, e.g.
+    ``Customer(api_key, sub_domain)``.
+    """
+    if not _DEFAULT_TRANSPORT:
+        _DEFAULT_TRANSPORT.append(Transport())
+    return _DEFAULT_TRANSPORT[0]
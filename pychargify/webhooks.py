@@ -0,0 +1,303 @@
+"""
+Webhook ingestion.
+
+A :class:`WebhookReceiver` verifies and queues the webhooks Chargify
+POSTs, dropping redelivered events; a :class:`WebhookProcessor` drains
+the queue in batches and hydrates the subscriptions and customers they
+reference before handing them to your code::
+
+    receiver = WebhookReceiver('SHARED-KEY')
+
+    # in the web view
+    receiver.receive(request.body, request.headers)
+
+    # in a worker
+    processor = WebhookProcessor(chargify, receiver.queue, handle_event)
+    processor.run(stop)
+
+Each batch fetches every subscription or customer it references once,
+on a bounded thread pool, however many events mention it.
+"""
+import hmac
+import json
+import hashlib
+import threading
+import collections
+
+import requests
+import six
+from six.moves import queue as queue_module
+from six.moves.urllib.parse import parse_qsl
+
+from pychargify import exceptions
+from pychargify.bulk import bounded_map
+
+
+SIGNATURE_HEADER = 'X-Chargify-Webhook-Signature-Hmac-Sha-256'
+
+EVENT_ID_HEADER = 'X-Chargify-Webhook-Id'
+
+
+def sign(body, shared_key):
+    """
+    Hex HMAC-SHA256 signature of a webhook ``body`` (bytes).
+    """
+    return hmac.new(
+        six.ensure_binary(shared_key), six.ensure_binary(body),
+        hashlib.sha256).hexdigest()
+
+
+def verify_signature(body, signature, shared_key):
+    """
+    Whether ``signature`` is the signature of ``body`` with the site's
+    ``shared_key``.
+    """
+    if not signature:
+        return False
+    return hmac.compare_digest(
+        sign(body, shared_key), six.ensure_str(signature).strip().lower())
+
+
+def parse_form(body):
+    """
+    Nest the ``payload[subscription][id]=1`` style keys of a form encoded
+    webhook body into dicts.
+    """
+    out = {}
+    for key, value in parse_qsl(six.ensure_str(body), keep_blank_values=True):
+        parts = key.replace(']', '').split('[')
+        node = out
+        for part in parts[:-1]:
+            node = node.setdefault(part, {})
+        node[parts[-1]] = value
+    return out
+
+
+def _as_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class WebhookEvent(object):
+    """
+    A webhook: its ``id``, ``event`` name and ``payload`` dict.
+
+    :class:`WebhookProcessor` fills in ``subscription`` and ``customer``
+    with the models the payload references, ``errors`` with the API or
+    connection errors raised fetching them and with the handler's errors,
+    and ``attempts`` with the number of times the handler failed on it.
+    """
+    def __init__(self, event_id, event, payload):
+        self.id = event_id
+        self.event = event
+        self.payload = payload
+        self.subscription = None
+        self.customer = None
+        self.errors = []
+        self.attempts = 0
+
+    def __repr__(self):
+        return '<WebhookEvent: {0} {1}>'.format(self.id, self.event)
+
+    @classmethod
+    def from_body(cls, body, event_id=None):
+        """
+        Build an event from a form encoded or JSON webhook body.
+        """
+        text = six.ensure_str(body).lstrip()
+        if text.startswith('{'):
+            content = json.loads(text)
+        else:
+            content = parse_form(text)
+
+        return cls(_as_id(content.get('id', event_id)) or event_id,
+                   content.get('event'), content.get('payload') or {})
+
+    @property
+    def subscription_id(self):
+        return _as_id((self.payload.get('subscription') or {}).get('id'))
+
+    @property
+    def customer_id(self):
+        customer = (self.payload.get('customer') or
+                    (self.payload.get('subscription') or {}).get('customer') or
+                    {})
+        return _as_id(customer.get('id'))
+
+
+class WebhookReceiver(object):
+    """
+    Verifies webhook signatures with the site's ``shared_key`` and puts new
+    events on ``queue`` (a ``Queue`` by default).
+
+    The ids of the last ``remember`` events are kept to drop redeliveries.
+    """
+    def __init__(self, shared_key, queue=None, remember=10000):
+        self.shared_key = shared_key
+        self.queue = queue if queue is not None else queue_module.Queue()
+        self.remember = remember
+        self.lock = threading.Lock()
+        self.seen = collections.OrderedDict()
+
+    def receive(self, body, headers):
+        """
+        Verify, parse and queue the raw ``body`` of a webhook POST.
+
+        Returns the queued :class:`WebhookEvent`, or ``None`` for an event
+        already received. Raises
+        :class:`pychargify.exceptions.ChargifyInvalidSignature` when the
+        signature does not match.
+        """
+        headers = dict((key.lower(), value) for key, value in headers.items())
+        signature = headers.get(SIGNATURE_HEADER.lower())
+        if not verify_signature(body, signature, self.shared_key):
+            raise exceptions.ChargifyInvalidSignature()
+
+        event = WebhookEvent.from_body(
+            body, _as_id(headers.get(EVENT_ID_HEADER.lower())))
+        if not self._first_delivery(event.id):
+            return None
+
+        self.queue.put(event)
+        return event
+
+    def receive_postback(self, body):
+        """
+        Queue one event per subscription id of a legacy postback (a JSON
+        array of subscription ids).
+        """
+        events = [WebhookEvent(None, 'postback', {'subscription': {'id': id_}})
+                  for id_ in json.loads(six.ensure_str(body))]
+        for event in events:
+            self.queue.put(event)
+        return events
+
+    def _first_delivery(self, event_id):
+        if event_id is None:
+            return True
+
+        with self.lock:
+            if event_id in self.seen:
+                return False
+            self.seen[event_id] = True
+            if len(self.seen) > self.remember:
+                self.seen.popitem(last=False)
+        return True
+
+
+class WebhookProcessor(object):
+    """
+    Drains ``queue`` in batches of up to ``batch_size`` events, hydrates
+    them with at most ``workers`` API calls in flight and passes each one
+    to ``handler``. Events the handler failed on ``max_attempts`` times
+    are kept in ``failed``.
+    """
+    def __init__(self, chargify, queue, handler, batch_size=100, workers=4,
+                 max_attempts=3):
+        self.chargify = chargify
+        self.queue = queue
+        self.handler = handler
+        self.batch_size = batch_size
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.failed = []
+
+    def next_batch(self, timeout=1.0):
+        """
+        Wait up to ``timeout`` seconds for an event, then take whatever
+        else is already queued, up to ``batch_size`` events.
+        """
+        try:
+            batch = [self.queue.get(timeout=timeout)]
+        except queue_module.Empty:
+            return []
+
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue_module.Empty:
+                break
+        return batch
+
+    def hydrate(self, events):
+        """
+        Attach the subscriptions and customers referenced by ``events``,
+        fetching each one once.
+        """
+        subscriptions = self._fetch(
+            self.chargify.subscription(),
+            set(event.subscription_id for event in events
+                if event.subscription_id))
+
+        # subscriptions carry their customer, fetch the others only
+        customers = dict(
+            (subscription.customer.id, subscription.customer)
+            for subscription in subscriptions.values()
+            if not isinstance(subscription, Exception) and
+            subscription.customer is not None)
+        customers.update(self._fetch(
+            self.chargify.customer(),
+            set(event.customer_id for event in events
+                if event.customer_id and event.customer_id not in customers)))
+
+        for event in events:
+            for name, found, object_id in (
+                    ('subscription', subscriptions, event.subscription_id),
+                    ('customer', customers, event.customer_id)):
+                obj = found.get(object_id)
+                if isinstance(obj, Exception):
+                    event.errors.append(obj)
+                elif obj is not None:
+                    setattr(event, name, obj)
+        return events
+
+    def _fetch(self, model, object_ids):
+        """
+        Map each of ``object_ids`` to its model, or to the API or
+        connection error raised fetching it.
+        """
+        def fetch(object_id):
+            try:
+                return model.get(object_id=object_id)
+            except (exceptions.ChargifyError,
+                    requests.RequestException) as error:
+                return error
+
+        if not object_ids:
+            return {}
+
+        return dict(
+            (object_id, future.result()) for object_id, future in bounded_map(
+                fetch, sorted(object_ids),
+                min(self.workers, len(object_ids))))
+
+    def process_batch(self, timeout=1.0):
+        """
+        Hydrate and handle the next batch; returns the number of events.
+
+        An exception raised by the handler is added to the event's
+        ``errors`` and the event is put back on the queue, up to
+        ``max_attempts`` times; it then goes to ``failed``. The rest of
+        the batch carries on either way.
+        """
+        events = self.hydrate(self.next_batch(timeout))
+        for event in events:
+            try:
+                self.handler(event)
+            except Exception as error:  # pylint: disable=W0703
+                event.errors.append(error)
+                event.attempts += 1
+                if event.attempts < self.max_attempts:
+                    self.queue.put(event)
+                else:
+                    self.failed.append(event)
+        return len(events)
+
+    def run(self, stop, timeout=1.0):
+        """
+        Process batches until the ``threading.Event`` ``stop`` is set.
+        """
+        while not stop.is_set():
+            self.process_batch(timeout)
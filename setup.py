@@ -1,17 +1,37 @@
 #!/usr/bin/env python
 import sys
 from setuptools import setup, find_packages
+from setuptools.command.build_py import build_py
 from setuptools.command.test import test as TestCommand
 from pychargify import get_version
 
 
+# The asyncio client (and its tests) use syntax from Python 3.6
+ASYNC_MODULES = (('pychargify', 'aio'), ('tests', 'aio_cases'))
+
+
+class BuildPy(build_py):
+    """
+    Leave out the asyncio modules on Pythons that can't compile them.
+    """
+    def find_package_modules(self, package, package_dir):
+        modules = build_py.find_package_modules(self, package, package_dir)
+        if sys.version_info < (3, 6):
+            modules = [module for module in modules
+                       if module[:2] not in ASYNC_MODULES]
+        return modules
+
+
 setup(
     name='pychargify',
     version=get_version(),
     description="",
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks', 'benchmarks.*']),
+    cmdclass={'build_py': BuildPy},
     test_suite='nose.collector',
-    install_requires=['requests==1.2.3', 'python-dateutil==2.1', 'six'],
+    install_requires=['requests==1.2.3', 'python-dateutil==2.1', 'six>=1.12',
+                      'futures; python_version < "3"'],
+    extras_require={'async': ['aiohttp'], 'fastjson': ['orjson']},
     tests_require=['nose', 'httpretty', ],
     dependency_links=[
         'git+https://github.com/gabrielfalcao/HTTPretty.git#egg=httpretty'
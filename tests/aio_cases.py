@@ -0,0 +1,139 @@
+"""
+Test the asyncio client
+
+Imported by ``test_aio`` on Python 3.6+ only, as asynchronous generators
+and comprehensions are syntax errors before.
+"""
+import asyncio
+import datetime
+import io
+import json
+
+from pychargify import aio
+from pychargify.exceptions import ChargifyError
+from pychargify.serializers import JSONCodec
+from .base import TestBase
+
+
+class StubTransport(object):
+    """
+    Answers requests from a dict of ``(method, url) -> (status, body)``.
+    """
+    codec = JSONCodec()
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.requests = []
+
+    async def request(self, method, url, **kwargs):
+        self.requests.append((method, url, kwargs))
+        await asyncio.sleep(0)
+        status, body = self.responses[(method, url)]
+        return aio.Response(status, url, {}, json.dumps(body).encode('utf-8'))
+
+
+class TestAsyncModels(TestBase):
+
+    def setUp(self):
+        self.subscriptions_list = self.load_fixtures('subscriptions')
+
+    def run_async(self, coro):
+        return asyncio.new_event_loop().run_until_complete(coro)
+
+    def test_get_subscriptions(self):
+        transport = StubTransport({
+            ('GET', 'https://some-test.chargify.com/subscriptions.json'):
+                (200, self.subscriptions_list),
+        })
+
+        obj = aio.Subscription('1234', 'some-test', transport)
+        subscriptions = self.run_async(obj.get())
+
+        self.assertEqual(len(subscriptions), 2)
+        self.assertIsInstance(subscriptions[0], aio.Subscription)
+        self.assertIsInstance(subscriptions[0].customer, aio.Customer)
+        self.assertIsInstance(subscriptions[0].product, aio.Product)
+        self.assertIsInstance(
+            subscriptions[0].updated_at, datetime.datetime)
+        self.assertIs(subscriptions[0].transport, transport)
+
+    def test_get_by_reference(self):
+        customer = self.subscriptions_list[0]['subscription']['customer']
+        transport = StubTransport({
+            ('GET', 'https://some-test.chargify.com/customers/lookup.json'):
+                (200, {'customer': customer}),
+        })
+
+        obj = aio.Customer('1234', 'some-test', transport)
+        result = self.run_async(obj.get_by_reference('greg1'))
+
+        self.assertEqual(result.id, customer['id'])
+        self.assertEqual(
+            transport.requests[0][2]['params'], {'reference': 'greg1'})
+
+    def test_create_customer(self):
+        transport = StubTransport({
+            ('POST', 'https://some-test.chargify.com/customers.json'):
+                (201, {'customer': {'id': 99, 'first_name': 'John'}}),
+        })
+
+        customer = aio.Customer('1234', 'some-test', transport)
+        customer.first_name = 'John'
+        self.run_async(customer.save())
+
+        self.assertEqual(customer.id, 99)
+        payload = json.loads(transport.requests[0][2]['data'])
+        self.assertEqual(payload['customer']['first_name'], 'John')
+
+    def test_client_hands_out_async_models(self):
+        chargify = aio.Chargify('1234', 'some-test')
+        self.assertIsInstance(chargify.transport, aio.AsyncTransport)
+        self.assertIsInstance(chargify.customer(), aio.Customer)
+        self.assertIs(chargify.subscription().transport, chargify.transport)
+
+    def test_models_share_default_transport(self):
+        first = aio.Customer('1234', 'some-test')
+        second = aio.Subscription('1234', 'some-test')
+        self.assertIs(first.transport, aio.default_transport())
+        self.assertIs(first.transport, second.transport)
+
+    def test_coalesced_reads(self):
+        transport = StubTransport({
+            ('GET', 'https://some-test.chargify.com/subscriptions/1.json'):
+                (200, self.subscriptions_list[0]),
+        })
+        transport.coalescer = aio.AsyncSingleFlight()
+
+        async def read_many():
+            obj = aio.Subscription('1234', 'some-test', transport)
+            return await asyncio.gather(
+                *[obj.get(object_id=1) for _ in range(5)])
+
+        results = self.run_async(read_many())
+
+        self.assertEqual(len(transport.requests), 1)
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def test_iter_all_unpaginated(self):
+        transport = StubTransport({
+            ('GET', 'https://some-test.chargify.com/products.json'):
+                (200, self.load_fixtures('products')),
+        })
+
+        async def walk():
+            obj = aio.Product('1234', 'some-test', transport)
+            return [product async for product in obj.iter_all()]
+
+        products = self.run_async(walk())
+
+        self.assertEqual(len(products), 2)
+        self.assertEqual(len(transport.requests), 2)
+
+    def test_statement_streaming_unsupported(self):
+        transport = StubTransport({})
+        obj = aio.Subscription('1234', 'some-test', transport)
+
+        self.assertRaises(
+            ChargifyError, obj.download_statement, 1, io.BytesIO())
+        self.assertRaises(ChargifyError, obj.iter_statement_pdf, 1)
+        self.assertEqual(transport.requests, [])
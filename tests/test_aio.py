@@ -0,0 +1,12 @@
+"""
+Test the asyncio client
+"""
+import sys
+import unittest
+
+if sys.version_info >= (3, 6):
+    from .aio_cases import TestAsyncModels
+else:
+    @unittest.skip('the asyncio client needs Python 3.6+')
+    class TestAsyncModels(unittest.TestCase):
+        pass
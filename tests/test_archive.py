@@ -0,0 +1,142 @@
+"""
+Test bulk statement archiving
+"""
+import json
+import os
+import re
+import shutil
+import tempfile
+import unittest
+
+import requests
+from httpretty import HTTPretty, httprettified
+
+from pychargify.api import Subscription
+from pychargify.archive import StatementArchiver
+
+
+class TestStatementArchiver(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.requested = []
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def register(self):
+        def ids_callback(request, uri, response_headers):
+            page = int(request.querystring['page'][0])
+            ids = {1: [1, 2], 2: [3]}.get(page, [])
+            return (200, response_headers,
+                    json.dumps({'statement_ids': ids}))
+
+        def statement_callback(request, uri, response_headers):
+            name = uri.rsplit('/', 1)[1]
+            self.requested.append(name)
+            if name.startswith('3.'):
+                return (404, response_headers, '')
+            if name.endswith('.pdf'):
+                return (200, response_headers, '%PDF-' + name)
+            return (200, response_headers, json.dumps(
+                {'statement': {'id': int(name.split('.')[0])}}))
+
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            'https://some-test.chargify.com/statements/ids.json',
+            body=ids_callback)
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            'https://some-test.chargify.com/subscriptions/9/statements/'
+            'ids.json',
+            body=json.dumps({'statement_ids': [2]}))
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            'https://some-test.chargify.com/subscriptions/8/statements/'
+            'ids.json',
+            body=ids_callback)
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            re.compile(r'https://some-test.chargify.com/statements/\d+\.'),
+            body=statement_callback)
+
+    @httprettified
+    def test_archive_account(self):
+        self.register()
+        archiver = StatementArchiver(
+            Subscription('1234', 'some-test'), self.tmp_dir, workers=2)
+
+        report = archiver.run()
+        self.assertEqual(report.downloaded, 4)
+        self.assertEqual(sorted(report.failed), [(3, 'json'), (3, 'pdf')])
+        self.assertEqual(
+            sorted(os.listdir(self.tmp_dir)),
+            ['1.json', '1.pdf', '2.json', '2.pdf'])
+        with open(os.path.join(self.tmp_dir, '2.pdf'), 'rb') as file_:
+            self.assertEqual(file_.read(), b'%PDF-2.pdf')
+        self.assertEqual(report.bytes, sum(
+            os.path.getsize(os.path.join(self.tmp_dir, name))
+            for name in os.listdir(self.tmp_dir)))
+
+        # a second run only retries what is missing
+        self.requested = []
+        report = archiver.run()
+        self.assertEqual(report.skipped, 4)
+        self.assertEqual(report.downloaded, 0)
+        self.assertEqual(sorted(self.requested), ['3.json', '3.pdf'])
+
+    @httprettified
+    def test_archive_subscriptions(self):
+        self.register()
+        archiver = StatementArchiver(
+            Subscription('1234', 'some-test'), self.tmp_dir,
+            formats=('pdf', ))
+
+        report = archiver.run(subscription_ids=[9])
+        self.assertEqual(report.downloaded, 1)
+        self.assertEqual(os.listdir(self.tmp_dir), ['2.pdf'])
+
+    @httprettified
+    def test_statement_ids_paginated(self):
+        """
+        Every page is read, and an endpoint ignoring ``page`` is read once.
+        """
+        self.register()
+        archiver = StatementArchiver(
+            Subscription('1234', 'some-test'), self.tmp_dir)
+
+        self.assertEqual(list(archiver.statement_ids([8])), [1, 2, 3])
+        self.assertEqual(list(archiver.statement_ids([9])), [2])
+        self.assertEqual(list(archiver.statement_ids([9, 8])), [2, 1, 2, 3])
+        self.assertEqual(list(archiver.statement_ids()), [1, 2, 3])
+
+    def test_errors_reported(self):
+        """
+        Connection and file errors fail their statement, not the run.
+        """
+        class FailingSubscription(object):
+            def download_statement(self, statement_id, path, chunk_size,
+                                   get_pdf):
+                if statement_id == 1:
+                    raise requests.ConnectionError('connection reset')
+                if statement_id == 2:
+                    raise IOError('disk full')
+                with open(path, 'wb') as file_:
+                    file_.write(b'%PDF-')
+                return 5
+
+        archiver = StatementArchiver(
+            FailingSubscription(), self.tmp_dir, formats=('pdf', ))
+
+        report = archiver.run(statement_ids=[1, 2, 3])
+        self.assertEqual(report.downloaded, 1)
+        self.assertEqual(report.bytes, 5)
+        self.assertIsInstance(
+            report.failed[(1, 'pdf')], requests.ConnectionError)
+        self.assertIsInstance(report.failed[(2, 'pdf')], IOError)
+
+    def test_unknown_format(self):
+        self.assertRaises(
+            ValueError, StatementArchiver,
+            Subscription('1234', 'some-test'), self.tmp_dir,
+            formats=('csv', ))
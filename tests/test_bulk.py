@@ -0,0 +1,102 @@
+"""
+Test bulk saves
+"""
+import itertools
+import json
+import threading
+import time
+import unittest
+
+from httpretty import HTTPretty, httprettified
+
+from pychargify.api import Customer
+from pychargify.bulk import bounded_map, save_many
+from pychargify.exceptions import ChargifyUnProcessableEntity
+
+
+class TestSaveMany(unittest.TestCase):
+
+    @httprettified
+    def test_save_many(self):
+        def create_callback(request, uri, response_headers):
+            customer = json.loads(request.body.decode('utf-8'))['customer']
+            if not customer['email']:
+                return (422, response_headers, json.dumps(
+                    {'errors': ['Email address: cannot be blank.']}))
+            customer['id'] = int(customer['reference'])
+            return (201, response_headers, json.dumps({'customer': customer}))
+
+        HTTPretty.register_uri(
+            HTTPretty.POST,
+            "https://some-test.chargify.com/customers.json",
+            body=create_callback)
+        HTTPretty.register_uri(
+            HTTPretty.PUT,
+            "https://some-test.chargify.com/customers/500.json",
+            body=json.dumps({'customer': {'id': 500, 'reference': 'kept'}}))
+
+        customers = []
+        for number in range(1, 21):
+            customer = Customer('1234', 'some-test')
+            customer.first_name = 'Customer'
+            customer.last_name = str(number)
+            customer.reference = str(number)
+            customer.email = '' if number == 7 else 'c{0}@example.com'.format(
+                number)
+            customers.append(customer)
+        existing = Customer('1234', 'some-test')
+        existing.id = 500
+        existing.reference = 'changed'
+        customers.append(existing)
+
+        # HTTPretty's fake sockets are not thread safe: one worker here,
+        # concurrency is covered by test_bounded_concurrency
+        results = list(save_many(iter(customers), workers=1))
+
+        self.assertEqual([result.object for result in results], customers)
+        errors = [result for result in results if result.error]
+        self.assertEqual(len(errors), 1)
+        self.assertIs(errors[0].object, customers[6])
+        self.assertIsInstance(errors[0].error, ChargifyUnProcessableEntity)
+
+        self.assertEqual(customers[0].id, 1)
+        self.assertEqual(customers[19].id, 20)
+        self.assertEqual(existing.reference, 'kept')
+
+    def test_bounded_concurrency(self):
+        lock = threading.Lock()
+        state = {'running': 0, 'peak': 0}
+
+        class Slow(object):
+            def save(self):
+                with lock:
+                    state['running'] += 1
+                    state['peak'] = max(state['peak'], state['running'])
+                time.sleep(0.01)
+                with lock:
+                    state['running'] -= 1
+                return self
+
+        objs = [Slow() for _ in range(20)]
+        results = list(save_many(objs, workers=4))
+
+        self.assertEqual([result.object for result in results], objs)
+        self.assertTrue(all(result.error is None for result in results))
+        self.assertTrue(1 < state['peak'] <= 4)
+
+    def test_bounded_map_endless(self):
+        calls = []
+
+        def square(number):
+            calls.append(number)
+            return number * number
+
+        results = bounded_map(square, itertools.count(1), workers=2)
+        self.assertEqual(
+            [(item, future.result())
+             for item, future in itertools.islice(results, 5)],
+            [(1, 1), (2, 4), (3, 9), (4, 16), (5, 25)])
+        results.close()
+
+        # at most the backlog of workers * 2 was submitted ahead
+        self.assertTrue(len(calls) <= 9)
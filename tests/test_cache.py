@@ -0,0 +1,179 @@
+"""
+Test the read-through response cache
+"""
+import json
+import unittest
+
+from httpretty import HTTPretty, httprettified
+
+from pychargify.api import Chargify
+from pychargify.cache import LocMemCache
+from .base import TestBase
+
+
+class TestLocMemCache(unittest.TestCase):
+
+    def test_lru_eviction(self):
+        cache = LocMemCache(max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(len(cache), 2)
+
+    def test_byte_bound(self):
+        cache = LocMemCache(max_bytes=10)
+        cache.set('a', 1, size=6)
+        cache.set('b', 2, size=6)
+
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.total_bytes, 6)
+
+    def test_invalidate_prefix(self):
+        cache = LocMemCache()
+        cache.set('p:1', 1, size=1)
+        cache.set('p:2', 2, size=1)
+        cache.set('q:1', 3, size=1)
+        cache.invalidate('p:')
+
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.total_bytes, 1)
+
+
+class TestReadThrough(TestBase):
+
+    def setUp(self):
+        self.products_list = self.load_fixtures('products')
+        self.cache = LocMemCache()
+        self.chargify = Chargify('1234', 'some-test', cache=self.cache)
+
+    @httprettified
+    def test_products_cached(self):
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            "https://some-test.chargify.com/products.json",
+            body=json.dumps(self.products_list))
+
+        first = self.chargify.product().get()
+        second = self.chargify.product().get()
+
+        self.assertEqual(len(HTTPretty.latest_requests), 1)
+        self.assertIsNot(first, second)
+        self.assertEqual([product.id for product in first],
+                         [product.id for product in second])
+        self.assertEqual(
+            len(self.chargify.product().get(compact=True)), len(first))
+        self.assertEqual(len(HTTPretty.latest_requests), 1)
+
+    @httprettified
+    def test_hits_do_not_share_models(self):
+        """
+        Changes to a cached result never leak into later reads.
+        """
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            "https://some-test.chargify.com/products/2.json",
+            body=json.dumps(self.products_list[0]))
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            "https://some-test.chargify.com/products.json",
+            body=json.dumps(self.products_list))
+
+        product = self.chargify.product().get(object_id=2)
+        name = product.name
+        product.name = 'changed'
+        again = self.chargify.product().get(object_id=2)
+        self.assertEqual(again.name, name)
+        self.assertEqual(again.changed_fields(), [])
+
+        products = self.chargify.product().get()
+        products.pop()
+        self.assertEqual(len(self.chargify.product().get()),
+                         len(self.products_list))
+        self.assertEqual(len(HTTPretty.latest_requests), 2)
+
+    @httprettified
+    def test_expired_entry_refetched(self):
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            "https://some-test.chargify.com/products/2.json",
+            body=json.dumps(self.products_list[0]))
+
+        self.chargify.product().get(object_id=2)
+        for entry, _ in self.cache.entries.values():
+            entry['expires'] = 0
+        self.chargify.product().get(object_id=2)
+
+        self.assertEqual(len(HTTPretty.latest_requests), 2)
+
+    @httprettified
+    def test_conditional_revalidation(self):
+        """
+        Stale entries are revalidated and reused as is on a 304.
+        """
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            "https://some-test.chargify.com/products.json",
+            responses=[
+                HTTPretty.Response(
+                    body=json.dumps(self.products_list),
+                    adding_headers={
+                        'ETag': '"v1"',
+                        'Last-Modified': 'Sun, 30 Jun 2013 21:57:38 GMT'}),
+                HTTPretty.Response(body='', status=304),
+            ])
+
+        first = self.chargify.product().get()
+        for entry, _ in self.cache.entries.values():
+            entry['expires'] = 0
+        second = self.chargify.product().get()
+
+        self.assertEqual([product.id for product in first],
+                         [product.id for product in second])
+        headers = HTTPretty.last_request.headers
+        self.assertEqual(headers['If-None-Match'], '"v1"')
+        self.assertEqual(
+            headers['If-Modified-Since'], 'Sun, 30 Jun 2013 21:57:38 GMT')
+
+        # revalidated entries are fresh again
+        self.chargify.product().get()
+        self.assertEqual(len(HTTPretty.latest_requests), 2)
+
+    @httprettified
+    def test_save_invalidates(self):
+        product = self.products_list[0]
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            "https://some-test.chargify.com/products/2.json",
+            body=json.dumps(product))
+        HTTPretty.register_uri(
+            HTTPretty.PUT,
+            "https://some-test.chargify.com/products/{0}.json".format(
+                product['product']['id']),
+            body=json.dumps(product))
+
+        obj = self.chargify.product().get(object_id=2)
+        self.assertEqual(len(self.cache), 1)
+
+        obj.name = 'Renamed'
+        obj.save()
+        self.assertEqual(len(self.cache), 0)
+
+    @httprettified
+    def test_customers_not_cached_by_default(self):
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            "https://some-test.chargify.com/customers.json",
+            body=json.dumps([]))
+
+        self.chargify.customer().get()
+        self.chargify.customer().get()
+        self.assertEqual(len(HTTPretty.latest_requests), 2)
+
+        self.cache.ttls['Customer'] = 60
+        self.chargify.customer().get()
+        self.chargify.customer().get()
+        self.assertEqual(len(HTTPretty.latest_requests), 3)
@@ -0,0 +1,81 @@
+"""
+Test request coalescing
+"""
+import json
+import threading
+import time
+import unittest
+
+from httpretty import HTTPretty, httprettified
+
+from pychargify.api import Chargify
+from pychargify.coalesce import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def run_concurrently(self, flight, func, count=5):
+        results = []
+
+        def worker():
+            try:
+                results.append(flight.do('key', func))
+            except ValueError as error:
+                results.append(error)
+
+        threads = [threading.Thread(target=worker) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def wait_for_waiters(self, flight, count):
+        deadline = time.time() + 5
+        while flight.calls['key'].waiters < count and time.time() < deadline:
+            time.sleep(0.001)
+
+    def test_one_call_shared(self):
+        flight = SingleFlight()
+        calls = []
+
+        def func():
+            calls.append(1)
+            self.wait_for_waiters(flight, 4)
+            return object()
+
+        results = self.run_concurrently(flight, func)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(flight.calls, {})
+
+    def test_errors_propagate(self):
+        flight = SingleFlight()
+
+        def func():
+            self.wait_for_waiters(flight, 4)
+            raise ValueError('boom')
+
+        results = self.run_concurrently(flight, func)
+
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(
+            isinstance(result, ValueError) for result in results))
+
+    @httprettified
+    def test_client_coalesces(self):
+        customer = {'customer': {'id': 1, 'reference': 'greg1'}}
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            "https://some-test.chargify.com/customers/lookup.json",
+            body=json.dumps(customer))
+
+        chargify = Chargify('1234', 'some-test', coalesce=True)
+        flight = chargify.transport.coalescer
+        self.assertIsInstance(flight, SingleFlight)
+
+        result = chargify.customer().get_by_reference('greg1')
+        self.assertEqual(result.id, 1)
+        self.assertEqual(flight.calls, {})
@@ -4,6 +4,7 @@ Test customer endpoint
 from __future__ import unicode_literals
 import datetime
 import json
+import threading
 import unittest
 
 from httpretty import HTTPretty, httprettified
@@ -171,6 +172,49 @@ class TestCustomer(unittest.TestCase):
         customer.reference = 'foobar'
         obj = customer.save()
 
+        self.assertEqual(
+            json.loads(HTTPretty.last_request.body.decode('utf-8')),
+            {'customer': {'reference': 'foobar'}})
+
+    @httprettified
+    def test_save_only_changed_fields(self):
+        """
+        Updates carry the assigned fields only and are skipped when
+        nothing changed.
+        """
+        person = self.customer_list[0]
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            "https://some-test.chargify.com/customers/12345.json",
+            body=json.dumps(person)
+        )
+        HTTPretty.register_uri(
+            HTTPretty.PUT,
+            "https://some-test.chargify.com/customers/12345.json",
+            body=json.dumps(person)
+        )
+
+        customer = Customer('1234', 'some-test').get(object_id=12345)
+        self.assertEqual(customer.changed_fields(), [])
+        customer.save()
+        self.assertEqual(HTTPretty.last_request.method, 'GET')
+
+        lazy = Customer('1234', 'some-test').parse(
+            person['customer'], lazy=True)
+        lazy.created_at
+        self.assertEqual(lazy.changed_fields(), [])
+
+        customer.email = 'new@example.com'
+        customer.first_name = 'Gregory'
+        self.assertEqual(customer.changed_fields(), ['first_name', 'email'])
+        customer.save()
+        self.assertEqual(HTTPretty.last_request.method, 'PUT')
+        self.assertEqual(
+            json.loads(HTTPretty.last_request.body.decode('utf-8')),
+            {'customer': {'first_name': 'Gregory',
+                          'email': 'new@example.com'}})
+        self.assertEqual(customer.changed_fields(), [])
+
     @httprettified
     def test_get_by_reference(self):
         """
@@ -187,3 +231,62 @@ class TestCustomer(unittest.TestCase):
         customer = obj.get_by_reference('greg1')
 
         self.assertEqual(customer.id, person['customer']['id'])
+
+    @httprettified
+    def test_iter_all(self):
+        """
+        ``iter_all`` follows pages until an empty one is returned.
+        """
+        pages = {
+            '1': self.customer_list * 2,
+            '2': self.customer_list,
+        }
+
+        def page_callback(request, uri, response_headers):
+            page = request.querystring['page'][0]
+            self.assertEqual(request.querystring['per_page'], ['2'])
+            return (200, response_headers, json.dumps(pages.get(page, [])))
+
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            "https://some-test.chargify.com/customers.json",
+            body=page_callback)
+
+        obj = Customer('1234', 'some-test')
+        customers = obj.iter_all(per_page=2)
+
+        self.assertFalse(isinstance(customers, list))
+        customers = list(customers)
+        self.assertEqual(len(customers), 3)
+        self.assertEqual(customers[2].reference, 'greg1')
+        self.assertEqual(len(HTTPretty.latest_requests), 3)
+
+    def test_instances_do_not_share_fields(self):
+        """
+        Parsing into one instance must not leak into others, even from
+        several threads at once.
+        """
+        obj = Customer('1234', 'some-test')
+        results = {}
+
+        def parse(number):
+            row = dict(self.customer_list[0]['customer'])
+            row.update({'id': number, 'reference': 'ref{0}'.format(number)})
+            for _ in range(50):
+                results[number] = obj.parse(row)
+
+        threads = [threading.Thread(target=parse, args=(number, ))
+                   for number in range(1, 9)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for number, customer in results.items():
+            self.assertEqual(customer.id, number)
+            self.assertEqual(customer.raw_content['id'], number)
+            self.assertEqual(customer._fields['reference'].to_string(),
+                             'ref{0}'.format(number))
+
+        self.assertEqual(obj.id, u'')
+        self.assertEqual(Customer('1234', 'some-test').reference, u'')
@@ -0,0 +1,43 @@
+"""
+Test model fields
+"""
+from __future__ import unicode_literals
+import datetime
+import unittest
+
+import dateutil.parser
+
+from pychargify.models import ChargifyDateField, parse_datetime
+
+
+class TestDateField(unittest.TestCase):
+
+    def test_fast_path_matches_dateutil(self):
+        for value in ('2013-08-28T20:40:23-04:00',
+                      '2013-08-28T20:40:23+05:30',
+                      '2013-08-28T20:40:23+00:00',
+                      '2013-08-28T20:40:23Z'):
+            self.assertEqual(
+                parse_datetime(value), dateutil.parser.parse(value))
+            self.assertEqual(
+                parse_datetime(value).utcoffset(),
+                dateutil.parser.parse(value).utcoffset())
+
+    def test_tzinfo_shared(self):
+        first = parse_datetime('2013-08-28T20:40:23-04:00')
+        second = parse_datetime('2014-01-02T03:04:05-04:00')
+        self.assertIs(first.tzinfo, second.tzinfo)
+
+    def test_fallback(self):
+        self.assertEqual(
+            parse_datetime('2013-08-28'), datetime.datetime(2013, 8, 28))
+        self.assertEqual(
+            parse_datetime('2013-08-28T20:40:23.5-04:00').microsecond,
+            500000)
+        self.assertRaises(ValueError, parse_datetime, '2013-13-28T20:40:23Z')
+
+    def test_date_field(self):
+        field = ChargifyDateField('2013-08-28T20:40:23-04:00')
+        self.assertEqual(field.to_python().hour, 20)
+        self.assertEqual(field.to_string(), '2013-08-28T20:40:23-04:00')
+        self.assertIsNone(ChargifyDateField('').to_python())
@@ -0,0 +1,125 @@
+"""
+Test request instrumentation
+"""
+import socket
+import unittest
+
+from pychargify.api import Chargify
+from pychargify.cache import LocMemCache
+from pychargify.exceptions import ChargifyNotFound
+from pychargify.instrumentation import (
+    Instrument, Metrics, StatsDInstrument, endpoint)
+from pychargify.scheduler import RequestScheduler
+from pychargify.stub import StubData, StubServer
+
+
+class Recorder(Instrument):
+    enabled = True
+
+    def __init__(self):
+        self.calls = []
+
+    def before_request(self, method, url):
+        self.calls.append(('before', method, endpoint(url)))
+
+    def after_request(self, method, url, status_code, seconds,
+                      sent_bytes=0, received_bytes=0, error=None):
+        self.calls.append(('after', method, endpoint(url), status_code))
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.server = StubServer(StubData(customers=5)).start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def client(self, instrument, **kwargs):
+        return Chargify(
+            'key', 'stub', base_url=self.server.url, instrument=instrument,
+            scheduler=RequestScheduler(
+                backoff_base=0, sleep=lambda seconds: None), **kwargs)
+
+    def test_endpoint(self):
+        self.assertEqual(
+            endpoint('https://x.chargify.com/customers/12/subscriptions.json'
+                     '?page=2'),
+            '/customers/:id/subscriptions.json')
+        self.assertEqual(endpoint('http://h/statements/9.pdf'),
+                         '/statements/:id.pdf')
+
+    def test_hooks(self):
+        recorder = Recorder()
+        chargify = self.client(recorder)
+        self.server.fail_next(429)
+        chargify.customer().get(object_id=1)
+
+        self.assertEqual(recorder.calls, [
+            ('before', 'GET', '/customers/:id.json'),
+            ('after', 'GET', '/customers/:id.json', 429),
+            ('before', 'GET', '/customers/:id.json'),
+            ('after', 'GET', '/customers/:id.json', 200),
+        ])
+
+    def test_metrics(self):
+        metrics = Metrics()
+        chargify = self.client(metrics, cache=LocMemCache())
+
+        self.server.fail_next(503)
+        for customer_id in (1, 2, 3):
+            chargify.customer().get(object_id=customer_id)
+        self.assertRaises(
+            ChargifyNotFound, chargify.customer().get, object_id=99)
+        customer = chargify.customer()
+        customer.email = 'new@example.com'
+        customer.save()
+
+        for _ in range(3):
+            chargify.product().get()
+
+        stats = metrics.endpoints[('GET', '/customers/:id.json')]
+        self.assertEqual(dict(stats.statuses), {200: 3, 404: 1, 503: 1})
+        self.assertEqual(stats.retries, 1)
+        self.assertEqual(stats.latency.count, 5)
+        self.assertTrue(stats.received_bytes > 0)
+
+        post = metrics.endpoints[('POST', '/customers.json')]
+        self.assertEqual(dict(post.statuses), {201: 1})
+        self.assertTrue(post.sent_bytes > 0)
+
+        self.assertEqual(metrics.parse_time['Customer'].count, 3)
+        self.assertEqual(metrics.decode_time['Product'].count, 1)
+        self.assertEqual(metrics.cache_hit_ratio('Product'), 2.0 / 3)
+        self.assertEqual(metrics.slowest(1)[0][:2],
+                         ('GET', '/customers/:id.json'))
+
+        text = metrics.prometheus()
+        self.assertIn(
+            'pychargify_responses_total{method="GET",'
+            'endpoint="/customers/:id.json",status="200"} 3', text)
+        self.assertIn(
+            'pychargify_request_duration_seconds_bucket{method="GET",'
+            'endpoint="/customers/:id.json",le="+Inf"} 5', text)
+        self.assertIn(
+            'pychargify_cache_lookups_total{model="Product",outcome="hit"} 2',
+            text)
+
+    def test_statsd(self):
+        receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        receiver.bind(('127.0.0.1', 0))
+        receiver.settimeout(5)
+        try:
+            instrument = StatsDInstrument(
+                port=receiver.getsockname()[1], prefix='app')
+            self.client(instrument).customer().get(object_id=1)
+
+            packets = [receiver.recv(65535).decode('utf-8')
+                       for _ in range(3)]
+        finally:
+            receiver.close()
+
+        lines = '\n'.join(packets).split('\n')
+        self.assertIn('app.request.GET.customers.id.200:1|c', lines)
+        self.assertTrue(any(line.startswith('app.parse.Customer:')
+                            for line in lines))
@@ -0,0 +1,116 @@
+"""
+Test the local SQLite mirror
+"""
+import json
+import os
+import shutil
+import tempfile
+
+from httpretty import HTTPretty, httprettified
+
+from .base import TestBase
+from pychargify.api import Chargify
+from pychargify.exceptions import ChargifyServerError
+from pychargify.mirror import Mirror
+
+
+class TestMirror(TestBase):
+
+    def setUp(self):
+        self.chargify = Chargify('1234', 'some-test')
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    @httprettified
+    def test_refresh_and_lookups(self):
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            "https://some-test.chargify.com/products.json",
+            body=json.dumps(self.load_fixtures('products')))
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            "https://some-test.chargify.com/customers.json",
+            responses=[
+                HTTPretty.Response(body=json.dumps([{'customer': {
+                    'id': 7, 'reference': 'ref7', 'email': 'a@b.com'}}])),
+                HTTPretty.Response(body='[]'),
+            ])
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            "https://some-test.chargify.com/subscriptions.json",
+            responses=[
+                HTTPretty.Response(body=json.dumps(
+                    self.load_fixtures('subscriptions')[:1])),
+                HTTPretty.Response(body='[]'),
+            ])
+
+        path = os.path.join(self.tmp_dir, 'mirror.db')
+        mirror = Mirror(self.chargify, path)
+        mirror.refresh()
+        mirror.close()
+
+        # lookups are served from disk, without the API
+        HTTPretty.disable()
+        mirror = Mirror(self.chargify, path)
+
+        self.assertEqual(mirror.customer_by_reference('ref7').id, 7)
+        self.assertEqual(mirror.customer_by_reference('greg1').id, 12345)
+        self.assertEqual(
+            [c.id for c in mirror.customers_by_email('me@foobar.com')],
+            [12345])
+        self.assertEqual(
+            mirror.product_by_handle('super-widget-1').name, 'Super Widget 1')
+
+        subscriptions = mirror.subscriptions_for_customer(12345)
+        self.assertEqual([s.id for s in subscriptions], [123])
+        self.assertEqual(subscriptions[0].customer.reference, 'greg1')
+        self.assertEqual(mirror.get_subscription(123).state, 'active')
+
+        self.assertIsNone(mirror.get_customer(1))
+        self.assertIsNone(mirror.product_by_handle('nope'))
+        mirror.close()
+
+    def test_add_replaces(self):
+        mirror = Mirror(self.chargify)
+        customer = self.chargify.customer().parse(
+            {'id': 1, 'reference': 'old', 'email': 'a@b.com'})
+        mirror.add(customer)
+        customer = self.chargify.customer().parse(
+            {'id': 1, 'reference': 'new', 'email': 'a@b.com'})
+        mirror.add(customer)
+
+        self.assertIsNone(mirror.customer_by_reference('old'))
+        self.assertEqual(mirror.customer_by_reference('new').id, 1)
+
+    def test_add_records(self):
+        mirror = Mirror(self.chargify)
+        subscriptions = self.chargify.subscription().process_result(
+            self.load_fixtures('subscriptions'), compact=True)
+        mirror.add_many(subscriptions)
+
+        subscription = mirror.get_subscription(123)
+        self.assertEqual(subscription.customer.reference, 'greg1')
+        self.assertEqual(subscription.updated_at, subscriptions[0].updated_at)
+        self.assertEqual(mirror.customer_by_reference('greg1').id, 12345)
+
+    @httprettified
+    def test_refresh_commits_each_page(self):
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            "https://some-test.chargify.com/products.json",
+            body='[]')
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            "https://some-test.chargify.com/customers.json",
+            responses=[
+                HTTPretty.Response(body=json.dumps([{'customer': {
+                    'id': 7, 'reference': 'ref7', 'email': 'a@b.com'}}])),
+                HTTPretty.Response(body='', status=500),
+            ])
+
+        mirror = Mirror(self.chargify)
+        self.assertRaises(
+            ChargifyServerError, mirror.refresh, per_page=1)
+        self.assertEqual(mirror.customer_by_reference('ref7').id, 7)
@@ -45,3 +45,20 @@ class TestProducts(TestBase):
         product = obj.get(object_id=2)
 
         self.assertTrue(product.require_credit_card)
+
+    @httprettified
+    def test_iter_all_unpaginated(self):
+        """
+        ``products.json`` ignores ``page``: the walk ends on the first page
+        repeating the previous one.
+        """
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            "https://some-test.chargify.com/products.json",
+            body=json.dumps(self.products_list))
+
+        obj = Product('1234', 'some-test')
+        products = list(obj.iter_all())
+
+        self.assertEqual(len(products), len(self.products_list))
+        self.assertEqual(len(HTTPretty.latest_requests), 2)
@@ -0,0 +1,107 @@
+"""
+Test the profiling mode
+"""
+import unittest
+
+from pychargify.api import Chargify
+from pychargify.instrumentation import Metrics, MultiInstrument
+from pychargify.profiling import PHASES, Profiler
+from pychargify.scheduler import RequestScheduler
+from pychargify.stub import StubData, StubServer
+
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        self.server = StubServer(StubData(customers=20)).start()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def client(self, **kwargs):
+        return Chargify(
+            'key', 'stub', base_url=self.server.url, profile=True,
+            scheduler=RequestScheduler(
+                backoff_base=0, sleep=lambda seconds: None), **kwargs)
+
+    def test_phase_breakdown(self):
+        chargify = self.client()
+        self.assertIsInstance(chargify.transport.instrument, Profiler)
+
+        subscriptions = list(chargify.subscription().iter_all(per_page=10))
+        self.assertEqual(len(subscriptions), 20)
+
+        report = chargify.profiler.report()
+        self.assertEqual(len(report), 1)
+        row = report[0]
+        self.assertEqual(
+            (row['method'], row['endpoint'], row['model'], row['calls']),
+            ('GET', '/subscriptions.json', 'Subscription', 3))
+        self.assertEqual(sorted(row['phases']), sorted(PHASES))
+        for phase in ('connect', 'ttfb', 'decode', 'build', 'nested'):
+            self.assertTrue(row['phases'][phase] > 0, phase)
+
+        # the pooled connection is only opened once
+        connects = [call.phases['connect'] > 0
+                    for call in chargify.profiler.calls]
+        self.assertEqual(connects, [True, False, False])
+
+        self.assertIn('/subscriptions.json', chargify.profiler.format_report())
+
+    def test_retries_belong_to_the_call(self):
+        chargify = self.client()
+        self.server.fail_next(503, 2)
+        chargify.customer().get(object_id=1)
+        chargify.customer().get(object_id=2)
+
+        calls = list(chargify.profiler.calls)
+        self.assertEqual([call.attempts for call in calls], [3, 1])
+        self.assertEqual([call.status_code for call in calls], [200, 200])
+        self.assertEqual(chargify.profiler.report()[0]['attempts'], 4)
+
+    def test_with_instrument(self):
+        metrics = Metrics()
+        chargify = self.client(instrument=metrics)
+        self.assertIsInstance(chargify.transport.instrument, MultiInstrument)
+
+        customer = chargify.customer()
+        customer.email = 'new@example.com'
+        customer.save()
+
+        self.assertEqual(len(metrics.endpoints), 1)
+        report = chargify.profiler.report()
+        self.assertEqual((report[0]['method'], report[0]['model']),
+                         ('POST', 'Customer'))
+
+    def test_prefetched_pages(self):
+        """
+        Prefetched pages are fetched and parsed on worker threads, each
+        call kept whole.
+        """
+        chargify = self.client()
+        subscriptions = list(chargify.subscription().iter_all(
+            per_page=5, prefetch=2))
+        self.assertEqual(len(subscriptions), 20)
+
+        report = chargify.profiler.report()
+        self.assertEqual(
+            [(row['method'], row['model']) for row in report],
+            [('GET', 'Subscription')])
+        parsed = [call for call in chargify.profiler.calls if call.parsed]
+        self.assertEqual(len(parsed), 4)
+        self.assertTrue(all(call.phases['build'] > 0 for call in parsed))
+
+    def test_lazy_nested_models(self):
+        """
+        Nested models of a lazy parse, built on first access, are not
+        charged to the next call.
+        """
+        chargify = self.client()
+        subscriptions = chargify.subscription().get(lazy=True)
+        self.assertEqual(subscriptions[0].customer.id, 1)
+        chargify.customer().get(object_id=1)
+
+        calls = list(chargify.profiler.calls)
+        self.assertEqual([call.model for call in calls],
+                         ['Subscription', 'Customer'])
+        self.assertEqual(calls[1].phases['nested'], 0)
@@ -0,0 +1,125 @@
+"""
+Test request scheduling: rate limiting, retries and the retry budget
+"""
+import json
+import unittest
+
+from httpretty import HTTPretty, httprettified
+from nose.tools import raises
+
+from pychargify.api import Product
+from pychargify.exceptions import ChargifyRateLimited
+from pychargify.scheduler import (
+    RequestScheduler, RetryBudget, TokenBucket, parse_retry_after)
+from pychargify.transport import Transport
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.sleeps = []
+        self.scheduler = RequestScheduler(
+            max_retries=2, sleep=self.sleeps.append)
+        self.transport = Transport(scheduler=self.scheduler)
+
+    def test_token_bucket(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, capacity=2, clock=clock)
+
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(bucket.reserve(), 0.5)
+
+        clock.now = 2.0
+        self.assertEqual(bucket.reserve(), 0)
+
+    def test_token_bucket_slow_rate(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=0.5, clock=clock)
+
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(bucket.reserve(), 2.0)
+
+        clock.now = 100.0
+        self.assertEqual(bucket.reserve(), 0)
+
+    def test_retry_budget(self):
+        budget = RetryBudget(ratio=0.5, min_retries=1)
+        self.assertTrue(budget.withdraw())
+        self.assertFalse(budget.withdraw())
+
+        budget.deposit()
+        budget.deposit()
+        self.assertTrue(budget.withdraw())
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after('3'), 3)
+        self.assertEqual(
+            parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT'), 0)
+        self.assertIsNone(parse_retry_after('soon'))
+        self.assertIsNone(parse_retry_after(None))
+
+    def test_post_not_retried_on_server_error(self):
+        self.assertIsNone(self.scheduler.retry_delay('POST', 0, 503, {}))
+        self.assertIsNotNone(self.scheduler.retry_delay('GET', 0, 503, {}))
+
+    def test_retry_after_capped(self):
+        scheduler = RequestScheduler(backoff_max=30.0)
+        self.assertEqual(
+            scheduler.retry_delay('GET', 0, 429, {'Retry-After': '3600'}), 30)
+        scheduler = RequestScheduler(retry_after_max=120)
+        self.assertEqual(
+            scheduler.retry_delay('GET', 0, 429, {'Retry-After': '3600'}), 120)
+
+    def test_retries_do_not_refill_budget(self):
+        scheduler = RequestScheduler(budget=RetryBudget(min_retries=0))
+        for attempt in range(1, 20):
+            scheduler.acquire('https://some-test.chargify.com/', attempt)
+        self.assertEqual(scheduler.budget.balance, 0)
+
+        scheduler.acquire('https://some-test.chargify.com/')
+        self.assertEqual(scheduler.budget.balance, 0.2)
+
+    @httprettified
+    def test_retry_after_honoured(self):
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            "https://some-test.chargify.com/products.json",
+            responses=[
+                HTTPretty.Response(
+                    body='', status=429, adding_headers={'Retry-After': '7'}),
+                HTTPretty.Response(body='', status=503),
+                HTTPretty.Response(body=json.dumps([]), status=200),
+            ])
+
+        obj = Product('1234', 'some-test', self.transport)
+        self.assertEqual(obj.get(), [])
+
+        self.assertEqual(len(self.sleeps), 2)
+        self.assertEqual(self.sleeps[0], 7)
+        stats = self.scheduler.stats.snapshot()
+        self.assertEqual(stats['requests'], 3)
+        self.assertEqual(stats['retries'], 2)
+        self.assertEqual(stats['rate_limited'], 1)
+        self.assertEqual(stats['server_errors'], 1)
+        self.assertEqual(stats['throttled_seconds'], 7)
+
+    @httprettified
+    @raises(ChargifyRateLimited)
+    def test_retries_exhausted(self):
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            "https://some-test.chargify.com/products.json",
+            body='', status=429)
+
+        obj = Product('1234', 'some-test', self.transport)
+        obj.get()
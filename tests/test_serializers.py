@@ -0,0 +1,55 @@
+"""
+Test the pluggable JSON codecs
+"""
+import json
+import unittest
+
+from httpretty import HTTPretty, httprettified
+from nose.tools import raises
+
+from pychargify import serializers
+from pychargify.api import Chargify
+from pychargify.exceptions import ChargifyError
+
+
+class TestSerializers(unittest.TestCase):
+
+    def test_default_codec(self):
+        codec = serializers.get_codec()
+        self.assertIsInstance(codec, serializers.JSONCodec)
+        self.assertEqual(codec.loads(b'{"a": [1, "\\u00e9"]}'),
+                         {'a': [1, u'é']})
+        self.assertEqual(json.loads(codec.dumps({'a': 1})), {'a': 1})
+
+    def test_installed_codecs_round_trip(self):
+        body = {'customer': {'id': 1, 'first_name': u'Jérôme'}}
+        for name in serializers.available_codecs():
+            codec = serializers.get_codec(name)
+            self.assertEqual(codec.loads(codec.dumps(body)), body)
+            self.assertEqual(
+                codec.loads(json.dumps(body).encode('utf-8')), body)
+
+    def test_auto_picks_fastest(self):
+        self.assertEqual(serializers.get_codec('auto').name,
+                         serializers.available_codecs()[0])
+
+    @raises(ChargifyError)
+    def test_unknown_codec(self):
+        serializers.get_codec('yaml')
+
+    @httprettified
+    def test_client_codec(self):
+        HTTPretty.register_uri(
+            HTTPretty.POST,
+            "https://some-test.chargify.com/customers.json",
+            body=json.dumps({'customer': {'id': 5, 'first_name': 'John'}}),
+            status=201)
+
+        chargify = Chargify('1234', 'some-test', codec='auto')
+        customer = chargify.customer()
+        customer.first_name = 'John'
+        customer.save()
+
+        self.assertEqual(customer.id, 5)
+        sent = json.loads(HTTPretty.last_request.body.decode('utf-8'))
+        self.assertEqual(sent['customer']['first_name'], 'John')
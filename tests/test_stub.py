@@ -0,0 +1,110 @@
+"""
+Test the client end to end against the stand-in server
+"""
+import io
+import unittest
+
+from pychargify.api import Chargify
+from pychargify.exceptions import ChargifyNotFound, ChargifyServerError
+from pychargify.scheduler import RequestScheduler
+from pychargify.stub import StubData, StubServer
+
+
+class TestStubServer(unittest.TestCase):
+
+    def setUp(self):
+        self.server = StubServer(StubData(
+            customers=30, products=3, statements_per_subscription=2,
+            pdf_size=5000)).start()
+        self.scheduler = RequestScheduler(
+            backoff_base=0, sleep=lambda seconds: None)
+        self.chargify = Chargify(
+            'key', 'stub', base_url=self.server.url, scheduler=self.scheduler)
+
+    def tearDown(self):
+        self.chargify.close()
+        self.server.stop()
+
+    def test_lists_and_lookups(self):
+        customers = list(self.chargify.customer().iter_all(per_page=7))
+        self.assertEqual([customer.id for customer in customers],
+                         list(range(1, 31)))
+
+        customer = self.chargify.customer().get_by_reference('customer-12')
+        self.assertEqual(customer.id, 12)
+        self.assertEqual(len(self.chargify.product().get()), 3)
+        self.assertEqual(
+            [product.id for product in self.chargify.product().iter_all()],
+            [1, 2, 3])
+
+        subscriptions = list(self.chargify.subscription().get(
+            prefetch=3, per_page=4))
+        self.assertEqual(len(subscriptions), 30)
+        self.assertEqual(subscriptions[11].customer.reference, 'customer-12')
+        self.assertEqual(
+            [s.id for s in self.chargify.subscription().get(customer_id=5)],
+            [5])
+        self.assertEqual(
+            [s.id for s in self.chargify.subscription().iter_all(
+                customer_id=5)],
+            [5])
+        self.assertEqual(
+            [s.id for s in self.chargify.subscription().get(
+                customer_id=5, prefetch=3)],
+            [5])
+
+        self.assertRaises(
+            ChargifyNotFound, self.chargify.customer().get, object_id=999)
+
+    def test_updated_at_order(self):
+        data = self.server.data
+        self.assertEqual(data.page_by_update(
+            'customers', {'direction': 'desc', 'per_page': '3'}),
+            [30, 29, 28])
+        self.assertEqual(data.page_by_update('customers', {
+            'start_datetime': '2013-01-01T00:05:00-04:00',
+            'per_page': '3', 'page': '2'}), [8, 9, 10])
+
+        customer = self.chargify.customer().get(object_id=2)
+        customer.reference = 'moved'
+        customer.save()
+
+        self.assertEqual(data.page_by_update(
+            'customers', {'direction': 'desc', 'per_page': '1'}), [2])
+        self.assertEqual(
+            self.chargify.customer().get_by_reference('moved').id, 2)
+        self.assertRaises(
+            ChargifyNotFound, self.chargify.customer().get_by_reference,
+            'customer-2')
+
+    def test_save(self):
+        customer = self.chargify.customer()
+        customer.first_name = 'New'
+        customer.email = 'new@example.com'
+        customer.save()
+        self.assertEqual(customer.id, 31)
+
+        customer.reference = 'renamed'
+        customer.save()
+        self.assertEqual(
+            self.chargify.customer().get(object_id=31).reference, 'renamed')
+
+    def test_statements(self):
+        subscription = self.chargify.subscription()
+        ids = subscription.get_statements(3, get_list=True)['statement_ids']
+        self.assertEqual(ids, [5, 6])
+
+        out = io.BytesIO()
+        self.assertEqual(subscription.download_statement(5, out), 5000)
+        self.assertTrue(out.getvalue().startswith(b'%PDF'))
+
+    def test_faults_are_retried(self):
+        self.server.fail_next(429, 2)
+        self.server.fail_next(503)
+        customer = self.chargify.customer().get(object_id=1)
+        self.assertEqual(customer.id, 1)
+        self.assertEqual(self.scheduler.stats.rate_limited, 2)
+
+        self.server.fail_next(503, 10)
+        self.assertRaises(
+            ChargifyServerError, self.chargify.customer().get, object_id=1)
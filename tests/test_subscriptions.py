@@ -2,12 +2,17 @@
 Test Subscription endpoints
 """
 import datetime
+import io
 import json
+import os
+import shutil
+import tempfile
 
 from httpretty import HTTPretty, httprettified
 from nose.tools import raises
 
 from pychargify.api import Subscription, Customer, Product
+from pychargify.exceptions import ChargifyNotFound
 from .base import TestBase
 
 class TestProducts(TestBase):
@@ -33,6 +38,67 @@ class TestProducts(TestBase):
         self.assertIsInstance(subscription.product, Product)
         self.assertIsInstance(subscription.updated_at, datetime.datetime)
 
+    @httprettified
+    def test_get_compact_subscription_list(self):
+        """
+        Compact records keep attribute access without an instance dict
+        or a copy of the credentials.
+        """
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            "https://some-test.chargify.com/subscriptions.json",
+            body=json.dumps(self.subscriptions_list))
+
+        obj = Subscription('1234', 'some-test')
+        records = obj.get(compact=True)
+
+        self.assertEqual(len(records), 2)
+        record = records[0]
+        row = self.subscriptions_list[0]['subscription']
+
+        self.assertFalse(hasattr(record, '__dict__'))
+        self.assertFalse(hasattr(record, 'api_key'))
+        self.assertEqual(record.id, row['id'])
+        self.assertEqual(record.state, row['state'])
+        self.assertEqual(record.customer.email, row['customer']['email'])
+        self.assertEqual(record.product.handle, row['product']['handle'])
+        self.assertIsInstance(record.updated_at, datetime.datetime)
+
+        subscription = record.to_model()
+        self.assertIsInstance(subscription, Subscription)
+        self.assertIsInstance(subscription.customer, Customer)
+        self.assertEqual(subscription.customer.id, row['customer']['id'])
+        self.assertEqual(subscription.api_key, '1234')
+        self.assertEqual(record.as_dict()['product']['id'],
+                         row['product']['id'])
+
+    @httprettified
+    def test_get_lazy_subscription_list(self):
+        """
+        Lazy parsing decodes dates and nested models on first access.
+        """
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            "https://some-test.chargify.com/subscriptions.json",
+            body=json.dumps(self.subscriptions_list))
+
+        obj = Subscription('1234', 'some-test')
+        subscription = obj.get(lazy=True)[0]
+        row = self.subscriptions_list[0]['subscription']
+
+        self.assertNotIn('updated_at', subscription.__dict__)
+        self.assertNotIn('customer', subscription.__dict__)
+
+        self.assertEqual(subscription.state, row['state'])
+        self.assertIsInstance(subscription.updated_at, datetime.datetime)
+        self.assertIsInstance(subscription.customer, Customer)
+        self.assertEqual(subscription.customer.email, row['customer']['email'])
+        self.assertIn('customer', subscription.__dict__)
+
+        subscription.state = 'canceled'
+        self.assertEqual(subscription.state, 'canceled')
+        self.assertNotIn('state', subscription._pending)
+
     @httprettified
     def test_get_subscription(self):
         """
@@ -49,6 +115,7 @@ class TestProducts(TestBase):
 
         self.assertIsInstance(subscription.customer, Customer)
         self.assertIsInstance(subscription.product, Product)
+        self.assertEqual(subscription.customer.id, 12345)
 
     @httprettified
     def test_get_subscription_by_customer_id(self):
@@ -73,6 +140,154 @@ class TestProducts(TestBase):
         subscriptions = obj.get(customer_id=12345)
         self.assertEqual(len(subscriptions), 2)
 
+    @httprettified
+    def test_iter_all_by_customer_id(self):
+        def page_callback(request, uri, response_headers):
+            if request.querystring['page'] == ['1']:
+                body = self.subscriptions_list
+            else:
+                body = []
+            return (200, response_headers, json.dumps(body))
+
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            'https://some-test.chargify.com/customers/12345/subscriptions.json',
+            body=page_callback
+        )
+
+        obj = Subscription('1234', 'some-test')
+        subscriptions = list(obj.iter_all(customer_id=12345))
+
+        self.assertEqual(len(subscriptions), 2)
+        self.assertIsInstance(subscriptions[0].customer, Customer)
+
+    @httprettified
+    def test_iter_all_by_customer_id_unpaginated(self):
+        """
+        The subscriptions of a customer are not paginated: every page
+        number returns the same rows.
+        """
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            'https://some-test.chargify.com/customers/12345/subscriptions.json',
+            body=json.dumps(self.subscriptions_list)
+        )
+
+        obj = Subscription('1234', 'some-test')
+        subscriptions = list(obj.iter_all(customer_id=12345))
+
+        self.assertEqual(len(subscriptions), 2)
+        self.assertEqual(len(HTTPretty.latest_requests), 2)
+
+    @httprettified
+    def test_get_prefetch(self):
+        """
+        Bulk export mode yields every page in order.
+        """
+        def page_callback(request, uri, response_headers):
+            page = int(request.querystring['page'][0])
+            body = []
+            if page <= 3:
+                body = [json.loads(json.dumps(row))
+                        for row in self.subscriptions_list]
+                for row in body:
+                    row['subscription']['id'] = page
+            return (200, response_headers, json.dumps(body))
+
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            'https://some-test.chargify.com/subscriptions.json',
+            body=page_callback
+        )
+
+        obj = Subscription('1234', 'some-test')
+        subscriptions = list(obj.get(prefetch=2, per_page=2))
+
+        self.assertEqual(
+            [subscription.id for subscription in subscriptions],
+            [1, 1, 2, 2, 3, 3])
+
+    @httprettified
+    def test_get_prefetch_by_customer_id(self):
+        """
+        Prefetching the unpaginated subscriptions of a customer ends on the
+        first repeated page.
+        """
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            'https://some-test.chargify.com/customers/12345/subscriptions.json',
+            body=json.dumps(self.subscriptions_list)
+        )
+
+        obj = Subscription('1234', 'some-test')
+        subscriptions = list(obj.get(customer_id=12345, prefetch=3))
+
+        self.assertEqual(len(subscriptions), 2)
+
+    def test_parse_plan(self):
+        """
+        Nested models are resolved once per class and null nested objects
+        parse to ``None``.
+        """
+        plan = Subscription._parse_plan()
+        self.assertIs(plan, Subscription._meta.parse_plan)
+        self.assertEqual(plan['customer'], (Customer, None))
+        self.assertIsNone(plan['state'][0])
+
+        row = dict(self.subscriptions_list[0]['subscription'], product=None)
+        subscription = Subscription('1234', 'some-test').parse(row)
+        self.assertIsNone(subscription.product)
+        self.assertIsInstance(subscription.customer, Customer)
+        self.assertIsInstance(subscription.created_at, datetime.datetime)
+
+    @httprettified
+    def test_download_statement(self):
+        pdf = b'%PDF-1.4' + b'x' * 100000
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            'https://some-test.chargify.com/statements/42.pdf',
+            body=pdf,
+            content_type='application/pdf'
+        )
+
+        obj = Subscription('1234', 'some-test')
+        out = io.BytesIO()
+        self.assertEqual(obj.download_statement(42, out), len(pdf))
+        self.assertEqual(out.getvalue(), pdf)
+        self.assertEqual(
+            HTTPretty.last_request.headers['Accept'], 'application/pdf')
+
+        chunks = list(obj.iter_statement_pdf(42, chunk_size=4096))
+        self.assertTrue(all(len(chunk) <= 4096 for chunk in chunks))
+        self.assertEqual(b''.join(chunks), pdf)
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp_dir, '42.pdf')
+            self.assertEqual(obj.download_statement(42, path), len(pdf))
+            with open(path, 'rb') as file_:
+                self.assertEqual(file_.read(), pdf)
+            self.assertEqual(os.listdir(tmp_dir), ['42.pdf'])
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    @httprettified
+    @raises(ChargifyNotFound)
+    def test_download_missing_statement(self):
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            'https://some-test.chargify.com/statements/42.pdf',
+            status=404
+        )
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp_dir, '42.pdf')
+            Subscription('1234', 'some-test').download_statement(42, path)
+        finally:
+            self.assertEqual(os.listdir(tmp_dir), [])
+            shutil.rmtree(tmp_dir)
+
     # @httprettified
     # def test_create_subscription(self):
     #     """
@@ -0,0 +1,190 @@
+"""
+Test the incremental sync engine
+"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from httpretty import HTTPretty, httprettified
+
+from pychargify.api import Customer, Subscription
+from pychargify.models import parse_datetime
+from pychargify.sync import FileCheckpoint, MemoryCheckpoint, SyncEngine
+
+
+def customer(customer_id, created_at, updated_at):
+    return {
+        'id': customer_id,
+        'first_name': 'Customer',
+        'last_name': str(customer_id),
+        'email': '{0}@example.com'.format(customer_id),
+        'created_at': created_at,
+        'updated_at': updated_at,
+    }
+
+
+class TestSyncEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.customers = [
+            customer(1, '2013-01-01T10:00:00-04:00',
+                     '2013-01-01T10:00:00-04:00'),
+            customer(2, '2013-01-01T10:00:00-04:00',
+                     '2013-01-02T10:00:00-04:00'),
+            customer(3, '2013-01-01T10:00:00-04:00',
+                     '2013-01-02T10:00:00-04:00'),
+            customer(4, '2013-01-03T10:00:00-04:00',
+                     '2013-01-03T10:00:00-04:00'),
+        ]
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def register(self, by_creation=False):
+        def list_callback(request, uri, response_headers):
+            query = request.querystring
+            self.assertEqual(query['date_field'], ['updated_at'])
+            self.assertNotIn('sort', query)
+            if by_creation:
+                # what the API does for customers
+                rows = sorted(self.customers, key=lambda row: row['id'])
+            else:
+                rows = sorted(self.customers, key=lambda row: (
+                    parse_datetime(row['updated_at']), row['id']))
+            if 'start_datetime' in query:
+                start = parse_datetime(query['start_datetime'][0])
+                rows = [row for row in rows
+                        if parse_datetime(row['updated_at']) >= start]
+
+            per_page = int(query['per_page'][0])
+            offset = (int(query['page'][0]) - 1) * per_page
+            body = [{'customer': row}
+                    for row in rows[offset:offset + per_page]]
+            return (200, response_headers, json.dumps(body))
+
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            "https://some-test.chargify.com/customers.json",
+            body=list_callback)
+
+    def run_engine(self, checkpoint, per_page=2):
+        engine = SyncEngine(
+            Customer('1234', 'some-test'), checkpoint, per_page=per_page)
+        return [(event.action, event.object.id) for event in engine.run()]
+
+    @httprettified
+    def test_incremental_runs(self):
+        self.register()
+        checkpoint = FileCheckpoint(os.path.join(self.tmp_dir, 'sync.json'))
+
+        self.assertEqual(self.run_engine(checkpoint), [
+            ('insert', 1), ('insert', 2), ('insert', 3), ('insert', 4)])
+        state = checkpoint.load()
+        self.assertEqual(state['high_water_mark'], '2013-01-03T10:00:00-04:00')
+        self.assertNotIn('baseline', state)
+
+        self.assertEqual(self.run_engine(checkpoint), [])
+
+        self.customers[0]['updated_at'] = '2013-01-05T10:00:00-04:00'
+        self.customers.append(customer(
+            5, '2013-01-06T10:00:00-04:00', '2013-01-06T10:00:00-04:00'))
+
+        self.assertEqual(
+            self.run_engine(checkpoint), [('update', 1), ('insert', 5)])
+
+    @httprettified
+    def test_records_sharing_the_mark(self):
+        """
+        A full page of records with the same updated_at is paged through.
+        """
+        for row in self.customers:
+            row['updated_at'] = '2013-01-02T10:00:00-04:00'
+        self.register()
+
+        events = self.run_engine(MemoryCheckpoint(), per_page=2)
+        self.assertEqual(sorted(event[1] for event in events), [1, 2, 3, 4])
+
+    @httprettified
+    def test_resume_after_interruption(self):
+        self.register()
+        checkpoint = MemoryCheckpoint()
+        engine = SyncEngine(
+            Customer('1234', 'some-test'), checkpoint, per_page=2)
+
+        events = engine.run()
+        next(events)
+        next(events)
+        next(events)
+        events.close()
+
+        # the first page is checkpointed, the interrupted one is redone
+        self.assertEqual(self.run_engine(checkpoint), [
+            ('insert', 3), ('insert', 4)])
+
+    @httprettified
+    def test_rows_out_of_order(self):
+        """
+        Customers are listed in creation order, not by updated_at: the
+        mark is the latest updated_at seen and no row is skipped.
+        """
+        self.customers[0]['updated_at'] = '2013-01-05T10:00:00-04:00'
+        self.register(by_creation=True)
+        checkpoint = MemoryCheckpoint()
+
+        self.assertEqual(self.run_engine(checkpoint), [
+            ('insert', 1), ('insert', 2), ('insert', 3), ('insert', 4)])
+        state = checkpoint.load()
+        self.assertEqual(state['high_water_mark'], '2013-01-05T10:00:00-04:00')
+        self.assertEqual(state['seen'], [1])
+        self.assertNotIn('window', state)
+
+        self.customers[2]['updated_at'] = '2013-01-06T10:00:00-04:00'
+        self.assertEqual(self.run_engine(checkpoint), [('update', 3)])
+
+
+    @httprettified
+    def test_rows_without_updated_at(self):
+        self.customers[1]['updated_at'] = None
+        self.customers[2]['updated_at'] = None
+        self.customers[2]['created_at'] = None
+        self.register(by_creation=True)
+        checkpoint = MemoryCheckpoint()
+
+        self.assertEqual(self.run_engine(checkpoint), [
+            ('insert', 1), ('insert', 2), ('insert', 3), ('insert', 4)])
+        self.assertEqual(checkpoint.load()['high_water_mark'],
+                         '2013-01-03T10:00:00-04:00')
+
+class TestSubscriptionSync(unittest.TestCase):
+
+    @httprettified
+    def test_sorted_by_updated_at(self):
+        rows = [
+            {'id': 1, 'created_at': '2013-01-01T10:00:00-04:00',
+             'updated_at': '2013-01-03T10:00:00-04:00'},
+            {'id': 2, 'created_at': '2013-01-01T10:00:00-04:00',
+             'updated_at': '2013-01-02T10:00:00-04:00'},
+        ]
+
+        def list_callback(request, uri, response_headers):
+            self.assertEqual(request.querystring['sort'], ['updated_at'])
+            body = []
+            if request.querystring['page'] == ['1'] and \
+                    'start_datetime' not in request.querystring:
+                body = [{'subscription': row} for row in rows]
+            return (200, response_headers, json.dumps(body))
+
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            "https://some-test.chargify.com/subscriptions.json",
+            body=list_callback)
+
+        checkpoint = MemoryCheckpoint()
+        engine = SyncEngine(Subscription('1234', 'some-test'), checkpoint)
+
+        self.assertEqual([event.object.id for event in engine.run()], [1, 2])
+        self.assertEqual(checkpoint.load()['high_water_mark'],
+                         '2013-01-03T10:00:00-04:00')
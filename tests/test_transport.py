@@ -0,0 +1,52 @@
+"""
+Test the pooled transport shared by a Chargify client
+"""
+import json
+
+from httpretty import HTTPretty, httprettified
+
+from pychargify.api import Chargify
+from pychargify.transport import Transport
+from .base import TestBase
+
+
+class TestTransport(TestBase):
+
+    def setUp(self):
+        self.subscriptions_list = self.load_fixtures('subscriptions')
+
+    def test_models_share_client_transport(self):
+        """
+        Every model handed out by the client reuses its transport.
+        """
+        chargify = Chargify('1234', 'some-test', pool_size=4, timeout=5)
+
+        self.assertIs(chargify.customer().transport, chargify.transport)
+        self.assertIs(chargify.product().transport, chargify.transport)
+        self.assertIs(chargify.subscription().transport, chargify.transport)
+
+        adapter = chargify.transport.session.get_adapter(
+            'https://some-test.chargify.com')
+        self.assertEqual(adapter._pool_maxsize, 4)
+        self.assertEqual(chargify.transport.timeout, 5)
+
+    def test_keep_alive_disabled(self):
+        transport = Transport(keep_alive=False)
+        self.assertEqual(transport.session.headers['Connection'], 'close')
+
+    @httprettified
+    def test_parsed_models_share_transport(self):
+        """
+        Models built while parsing a response keep the parent's transport.
+        """
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            "https://some-test.chargify.com/subscriptions.json",
+            body=json.dumps(self.subscriptions_list))
+
+        chargify = Chargify('1234', 'some-test')
+        subscription = chargify.subscription().get()[0]
+
+        self.assertIs(subscription.transport, chargify.transport)
+        self.assertIs(subscription.customer.transport, chargify.transport)
+        self.assertIs(subscription.product.transport, chargify.transport)
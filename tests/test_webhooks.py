@@ -0,0 +1,168 @@
+"""
+Test webhook ingestion
+"""
+import json
+import threading
+
+import requests
+from httpretty import HTTPretty, httprettified
+from nose.tools import raises
+from six.moves.urllib.parse import urlencode
+
+from pychargify.api import Chargify, Customer, Subscription
+from pychargify.exceptions import ChargifyInvalidSignature, ChargifyNotFound
+from pychargify.webhooks import (
+    SIGNATURE_HEADER, WebhookEvent, WebhookProcessor, WebhookReceiver, sign)
+from .base import TestBase
+
+
+def webhook_body(event_id, event, subscription_id=None, customer_id=None):
+    fields = [('id', event_id), ('event', event)]
+    if subscription_id:
+        fields.append(('payload[subscription][id]', subscription_id))
+    if customer_id:
+        fields.append(('payload[customer][id]', customer_id))
+    return urlencode(fields).encode('utf-8')
+
+
+class TestWebhooks(TestBase):
+
+    def setUp(self):
+        self.receiver = WebhookReceiver('secret')
+
+    def deliver(self, body):
+        return self.receiver.receive(
+            body, {SIGNATURE_HEADER.lower(): sign(body, 'secret')})
+
+    def test_parse_form(self):
+        event = WebhookEvent.from_body(
+            webhook_body(7, 'signup_success', subscription_id=123))
+        self.assertEqual(event.id, 7)
+        self.assertEqual(event.event, 'signup_success')
+        self.assertEqual(event.subscription_id, 123)
+        self.assertIsNone(event.customer_id)
+
+        event = WebhookEvent.from_body(json.dumps({
+            'id': 8, 'event': 'customer_update',
+            'payload': {'customer': {'id': 5}}}))
+        self.assertEqual((event.id, event.customer_id), (8, 5))
+
+    def test_dedupe(self):
+        body = webhook_body(1, 'renewal_success', subscription_id=123)
+        self.assertIsInstance(self.deliver(body), WebhookEvent)
+        self.assertIsNone(self.deliver(body))
+        self.assertEqual(self.receiver.queue.qsize(), 1)
+
+    @raises(ChargifyInvalidSignature)
+    def test_bad_signature(self):
+        body = webhook_body(1, 'renewal_success', subscription_id=123)
+        self.receiver.receive(body, {SIGNATURE_HEADER: sign(body, 'wrong')})
+
+    @httprettified
+    def test_process_batch(self):
+        subscription = self.load_fixtures('subscriptions')[0]
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            "https://some-test.chargify.com/subscriptions/123.json",
+            body=json.dumps(subscription))
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            "https://some-test.chargify.com/subscriptions/404.json",
+            status=404)
+        HTTPretty.register_uri(
+            HTTPretty.GET,
+            "https://some-test.chargify.com/customers/77.json",
+            body=json.dumps({'customer': {'id': 77, 'reference': 'c77'}}))
+
+        for event_id in range(1, 6):
+            self.deliver(webhook_body(
+                event_id, 'renewal_success', subscription_id=123))
+        self.deliver(webhook_body(6, 'customer_update', customer_id=12345))
+        self.deliver(webhook_body(7, 'customer_update', customer_id=77))
+        self.deliver(webhook_body(8, 'renewal_failure', subscription_id=404))
+
+        handled = []
+        # HTTPretty's fake sockets are not thread safe: one worker
+        processor = WebhookProcessor(
+            Chargify('1234', 'some-test'), self.receiver.queue,
+            handled.append, batch_size=50, workers=1)
+        self.assertEqual(processor.process_batch(timeout=0), 8)
+
+        paths = [request.path for request in HTTPretty.latest_requests]
+        self.assertEqual(sorted(paths), [
+            '/customers/77.json',
+            '/subscriptions/123.json',
+            '/subscriptions/404.json'])
+
+        self.assertEqual([event.id for event in handled], list(range(1, 9)))
+        self.assertIsInstance(handled[0].subscription, Subscription)
+        self.assertIs(handled[0].subscription, handled[4].subscription)
+        self.assertIsInstance(handled[5].customer, Customer)
+        self.assertEqual(handled[5].customer.id, 12345)
+        self.assertEqual(handled[6].customer.reference, 'c77')
+        self.assertIsInstance(handled[7].errors[0], ChargifyNotFound)
+
+        stop = threading.Event()
+        stop.set()
+        processor.run(stop)
+        self.assertEqual(processor.process_batch(timeout=0), 0)
+
+    def test_connection_errors_kept_on_events(self):
+        class Unreachable(object):
+            def get(self, object_id=None):
+                raise requests.ConnectionError('connection refused')
+
+        class Client(object):
+            def subscription(self):
+                return Unreachable()
+
+            def customer(self):
+                return Unreachable()
+
+        self.deliver(webhook_body(1, 'renewal_success', subscription_id=123))
+        handled = []
+        processor = WebhookProcessor(
+            Client(), self.receiver.queue, handled.append, workers=1)
+
+        self.assertEqual(processor.process_batch(timeout=0), 1)
+        self.assertIsInstance(handled[0].errors[0], requests.ConnectionError)
+
+    def test_failing_handler(self):
+        class Client(object):
+            def subscription(self):
+                return None
+
+            def customer(self):
+                return None
+
+        for event_id in range(1, 4):
+            self.deliver(webhook_body(event_id, 'signup_success'))
+        handled = []
+
+        def handler(event):
+            if event.id == 2 and not event.errors:
+                raise ValueError('handler bug')
+            handled.append(event.id)
+
+        processor = WebhookProcessor(Client(), self.receiver.queue, handler)
+
+        self.assertEqual(processor.process_batch(timeout=0), 3)
+        self.assertEqual(handled, [1, 3])
+        self.assertEqual(processor.process_batch(timeout=0), 1)
+        self.assertEqual(handled, [1, 3, 2])
+
+        def broken(event):
+            raise ValueError('handler bug')
+
+        self.deliver(webhook_body(4, 'signup_success'))
+        processor.handler = broken
+        for _ in range(3):
+            self.assertEqual(processor.process_batch(timeout=0), 1)
+        self.assertEqual(processor.process_batch(timeout=0), 0)
+        self.assertEqual([event.id for event in processor.failed], [4])
+        self.assertEqual(len(processor.failed[0].errors), 3)
+
+    def test_postback(self):
+        events = self.receiver.receive_postback('[1, 2]')
+        self.assertEqual([event.subscription_id for event in events], [1, 2])
+        self.assertEqual(self.receiver.queue.qsize(), 2)